@@ -0,0 +1,223 @@
+"""Process-wide caches behind the app's pages, shared by every session
+
+Kept in an importable module rather than the app script: st.cache_resource
+keys entries by the function's module, and the script runs as __main__, so
+only functions defined here can be filled by the background warm-up (see
+warmup.py) before the first session asks for them.
+"""
+
+import os
+
+import streamlit as st
+
+from chart_payload import slim_figure, spec_bytes, spec_figure
+from content_store import CONTENT_DIR, ContentStore
+from diagram_export import DiagramExporter
+from diagrams import build_case_timeline, build_diagram, build_overview
+from flashcards import Deck, FlashcardService, ReviewStore
+from instrumentation import record_bytes, span
+from search_index import SearchIndex
+from page_html import topic_fragments
+
+# Lite mode shows static chart images instead of interactive Plotly charts, so slow
+# connections skip plotly.js and the figure JSON. Deployment default, or ?lite=1 per session.
+LITE_MODE = os.environ.get("LAND_LAW_LITE", "") not in ("", "0", "false")
+LITE_IMAGE_FORMAT = os.environ.get("LAND_LAW_LITE_FORMAT", "svg")
+
+# Rendered export artifacts; next to the content unless a deployment (or the load test) moves them
+EXPORT_DIR = os.environ.get("LAND_LAW_EXPORT_DIR", os.path.join(CONTENT_DIR, ".exports"))
+
+# Maximum number of built figures kept in the shared figure cache
+FIGURE_CACHE_SIZE = 128
+
+# Maximum number of topics whose page HTML is kept in the shared cache
+TOPIC_HTML_CACHE_SIZE = 512
+
+# Charts per overview figure; each page is built and sent as one subplot grid
+OVERVIEW_PAGE_SIZE = 12
+
+
+@st.cache_resource(show_spinner=False)
+def get_content_store():
+    """One content store per process, shared by every session"""
+    return ContentStore(CONTENT_DIR)
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def get_search_index(version):
+    """Build the search index once per content version and share it across sessions"""
+    return SearchIndex.build(get_content_store().items())
+
+
+@st.cache_resource(max_entries=TOPIC_HTML_CACHE_SIZE, show_spinner=False)
+def _cached_topic_html(content_hash, cases_version, _topic_key):
+    """Render a topic's page body to HTML once per content and case-law version"""
+    return topic_fragments(get_content_store().get(_topic_key))
+
+
+def create_topic_html(topic_key):
+    """Return the cached (head, body) HTML fragments of a topic page"""
+    content_store = get_content_store()
+    with span("create_topic_html"):
+        # Keyed by hashes the manifest already holds, so a cache hit never decodes the topic
+        fragments = _cached_topic_html(content_store.manifest()[topic_key]["content_hash"],
+                                       content_store.cases_version, topic_key)
+    record_bytes("topic_html", sum(len(fragment) for fragment in fragments))
+    return fragments
+
+
+@st.cache_resource(max_entries=FIGURE_CACHE_SIZE, show_spinner=False)
+def _cached_diagram(content_hash, _topic_key):
+    """Build a figure once per diagram content hash and share it across sessions
+
+    Charts are built from their data alone, so topics with identical diagram
+    data share one figure; the topic key (unhashed) only says where to read it.
+    """
+    return build_diagram(_topic_key, get_content_store().get(_topic_key).diagram_data)
+
+
+@st.cache_resource(max_entries=FIGURE_CACHE_SIZE, show_spinner=False)
+def _cached_chart_spec(content_hash, _topic_key):
+    """Compact a figure for the browser once per content hash; returns (figure, spec bytes)"""
+    spec = slim_figure(_cached_diagram(content_hash, _topic_key))
+    return spec_figure(spec), spec_bytes(spec)
+
+
+def create_chart_spec(topic_key):
+    """Return the cached figure of a topic's compact spec, as sent by st.plotly_chart"""
+    with span("create_chart_spec"):
+        # The manifest already holds the hash, so a cache hit never opens the topic file
+        spec, size = _cached_chart_spec(get_content_store().manifest()[topic_key]["diagram_hash"], topic_key)
+    record_bytes(f"chart:{topic_key}", size)
+    return spec
+
+
+def overview_pages(corpus):
+    """Topics with a chart, split into the pages of the charts overview"""
+    topic_keys = [topic_key for topic_key, has_diagram in zip(corpus.keys, corpus.columns["has_diagram"])
+                  if has_diagram]
+    return [topic_keys[start:start + OVERVIEW_PAGE_SIZE] for start in range(0, len(topic_keys), OVERVIEW_PAGE_SIZE)]
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _cached_overview(version, topic_keys):
+    """Combine the cached figures of several topics into one compact spec; returns (figure, spec bytes)"""
+    manifest = get_content_store().manifest()
+    figures = [_cached_diagram(manifest[topic_key]["diagram_hash"], topic_key) for topic_key in topic_keys]
+    spec = slim_figure(build_overview(figures, [manifest[topic_key]["title"] for topic_key in topic_keys]))
+    return spec_figure(spec), spec_bytes(spec)
+
+
+def create_overview_spec(topic_keys):
+    """Return the cached overview figure for a page of topics"""
+    with span("create_overview_spec"):
+        spec, size = _cached_overview(get_content_store().version, tuple(topic_keys))
+    record_bytes("chart:overview", size)
+    return spec
+
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _cached_case_timeline(version, text, topic_key, start, end):
+    """Timeline of the cases matching one set of browser filters; returns (figure, spec bytes)"""
+    content_store = get_content_store()
+    cases = content_store.cases().query(text, topic_key, start, end)
+    titles = {key: entry["title"] for key, entry in content_store.manifest().items()}
+    spec = slim_figure(build_case_timeline(cases, titles))
+    return spec_figure(spec), spec_bytes(spec)
+
+
+def create_case_timeline_spec(text, topic_key, start, end):
+    """Return the cached timeline figure for the case browser's current filters"""
+    with span("create_case_timeline_spec"):
+        spec, size = _cached_case_timeline(get_content_store().version, text, topic_key, start, end)
+    record_bytes("chart:case_timeline", size)
+    return spec
+
+
+@st.cache_resource(max_entries=FIGURE_CACHE_SIZE, show_spinner=False)
+def _cached_static_diagram(content_hash, fmt, _topic_key):
+    """Render a figure to SVG or PNG once per (content hash, format) and share it across sessions"""
+    from static_charts import render_static
+    image = render_static(_cached_diagram(content_hash, _topic_key), fmt)
+    # st.image takes SVG as markup and PNG as bytes
+    return image.decode("utf-8") if fmt == "svg" else image
+
+
+def create_static_diagram(topic_key, fmt=LITE_IMAGE_FORMAT):
+    """Return the cached static image of a topic's figure for lite mode"""
+    with span("create_static_diagram"):
+        return _cached_static_diagram(get_content_store().manifest()[topic_key]["diagram_hash"], fmt, topic_key)
+
+
+@st.cache_resource(show_spinner=False)
+def get_diagram_exporter():
+    """One exporter per process, caching its artifacts in EXPORT_DIR"""
+    return DiagramExporter(EXPORT_DIR)
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_flashcard_deck(version):
+    """Generate the flashcard deck once per content version"""
+    return Deck(get_content_store().items())
+
+
+@st.cache_resource(show_spinner=False)
+def get_flashcard_service():
+    """One flashcard scheduler and SQLite writer per process"""
+    return FlashcardService(ReviewStore())
+
+
+def _warm_topic_html():
+    content_store = get_content_store()
+    for topic_key, entry in list(content_store.manifest().items())[:TOPIC_HTML_CACHE_SIZE]:
+        _cached_topic_html(entry["content_hash"], content_store.cases_version, topic_key)
+
+
+def _warm_charts():
+    manifest = get_content_store().manifest()
+    topic_keys = [topic_key for topic_key, entry in manifest.items() if entry["has_diagram"]]
+    # Filling more than the cache holds would only evict the first charts again
+    for topic_key in topic_keys[:FIGURE_CACHE_SIZE]:
+        _cached_chart_spec(manifest[topic_key]["diagram_hash"], topic_key)
+        if LITE_MODE:
+            _cached_static_diagram(manifest[topic_key]["diagram_hash"], LITE_IMAGE_FORMAT, topic_key)
+
+
+def _warm_overview():
+    content_store = get_content_store()
+    pages = overview_pages(content_store.corpus())
+    if pages:
+        _cached_overview(content_store.version, tuple(pages[0]))
+
+
+def _warm_cases():
+    content_store = get_content_store()
+    index = content_store.cases()
+    if len(index):
+        # The case browser opens unfiltered, over the full year range
+        _cached_case_timeline(content_store.version, "", None, index.first_year, index.last_year)
+
+
+def _warm_exports():
+    content_store = get_content_store()
+    get_diagram_exporter().ensure(content_store, list(content_store.manifest()))
+
+
+def warm_up_tasks():
+    """(name, callable) pairs that fill the caches a first visitor would otherwise wait on
+
+    Ordered by how soon a visitor needs them: topic pages and search first,
+    the diagram export artifacts (rendered in worker processes) last. The
+    cached functions are called directly, so warm-up never counts as bytes
+    sent to a browser.
+    """
+    return [
+        ("content", lambda: get_content_store().corpus().table()),
+        ("topics", _warm_topic_html),
+        ("charts", _warm_charts),
+        ("search", lambda: get_search_index(get_content_store().version)),
+        ("flashcards", lambda: get_flashcard_deck(get_content_store().version)),
+        ("overview", _warm_overview),
+        ("cases", _warm_cases),
+        ("exports", _warm_exports),
+    ]
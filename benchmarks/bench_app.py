@@ -0,0 +1,245 @@
+"""Benchmark per-page rerun latency, memory and payload size with AppTest
+
+Usage:
+    python benchmarks/bench_app.py                         # current corpus
+    python benchmarks/bench_app.py --scales 1,10,100,1000  # synthetic corpora
+    python benchmarks/bench_app.py --output results.json --baseline baseline.json
+
+Each scale runs in a fresh interpreter against a synthetic copy of the
+content directory with every topic repeated that many times. For every
+entry path (home, each topic, search, notes export, diagram export) the
+results record median wall time, tracemalloc peak and the bytes of the
+protobuf messages the page produced, broken down by element type.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "land_law_app.py")
+SOURCE_TOPICS = os.path.join(ROOT, "content", "topics")
+SOURCE_CASES = os.path.join(ROOT, "content", "cases.json")
+
+
+def build_corpus(scale, target):
+    """Write a content directory with every topic and its cases repeated `scale` times"""
+    topics_dir = os.path.join(target, "topics")
+    os.makedirs(topics_dir)
+    names = sorted(name for name in os.listdir(SOURCE_TOPICS) if name.endswith(".json"))
+    for copy in range(scale):
+        for name in names:
+            with open(os.path.join(SOURCE_TOPICS, name), encoding="utf-8") as f:
+                topic = json.load(f)
+            topic_key = name[:-5] if copy == 0 else f"{name[:-5]}_{copy}"
+            if copy:
+                topic["title"] = f"{topic['title']} ({copy})"
+            topic["order"] = copy * len(names) + topic.get("order", 0)
+            with open(os.path.join(topics_dir, f"{topic_key}.json"), "w", encoding="utf-8") as f:
+                json.dump(topic, f)
+    # Each copy of a topic gets its own copy of that topic's case law
+    with open(SOURCE_CASES, encoding="utf-8") as f:
+        cases = json.load(f)["cases"]
+    copies = [dict(case, name=case["name"] if copy == 0 else f"{case['name']} ({copy})",
+                   topics=[key if copy == 0 else f"{key}_{copy}" for key in case["topics"]])
+              for copy in range(scale) for case in cases]
+    with open(os.path.join(target, "cases.json"), "w", encoding="utf-8") as f:
+        json.dump({"cases": copies}, f)
+    return target
+
+
+def message_bytes(app_test):
+    """Serialized size of every element on the page, by element type"""
+    sizes = {}
+    stack = [app_test._tree]
+    while stack:
+        node = stack.pop()
+        children = getattr(node, "children", None)
+        if children:
+            stack.extend(children.values())
+        proto = getattr(node, "proto", None)
+        if proto is None or children:
+            continue
+        kind = node.type
+        sizes[kind] = sizes.get(kind, 0) + proto.ByteSize()
+        # Data URLs ride inside markdown; count them separately as well
+        if kind == "markdown" and "data:" in proto.body:
+            sizes["data_url"] = sizes.get("data_url", 0) + len(proto.body)
+    return sizes
+
+
+def measure(action, repeat):
+    """Run action `repeat` times; return (median seconds, peak bytes, last result)"""
+    timings = []
+    peak = 0
+    result = None
+    for _ in range(repeat):
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = action()
+        timings.append(time.perf_counter() - start)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return statistics.median(timings), peak, result
+
+
+def run_paths(repeat, max_topics, search_term):
+    """Drive every entry path of the app in this process and collect results"""
+    from streamlit.testing.v1 import AppTest
+
+    results = {}
+
+    def record(path, action, count_messages=True, times=repeat):
+        try:
+            seconds, peak, value = measure(action, times)
+        except Exception as exc:
+            # Keep benchmarking the other paths; the failure is part of the result
+            tracemalloc.stop()
+            results[path] = {"error": f"{type(exc).__name__}: {exc}"}
+            return
+        entry = {"wall_ms": seconds * 1000, "peak_kib": peak / 1024}
+        if count_messages and value.exception:
+            entry["error"] = "; ".join(error.message.splitlines()[0] for error in value.exception)
+        if count_messages:
+            sizes = message_bytes(value)
+            entry["message_bytes"] = sum(size for kind, size in sizes.items() if kind != "data_url")
+            entry["message_bytes_by_type"] = sizes
+        else:
+            entry["payload_bytes"] = value
+        results[path] = entry
+
+    app_test = AppTest.from_file(APP_PATH, default_timeout=600)
+    # The first run pays for imports and cache fills; report it on its own
+    record("home (cold)", app_test.run, times=1)
+    record("home", app_test.run)
+
+    topic_keys = [button.key[4:] for button in app_test.sidebar.button
+                  if button.key and button.key.startswith("btn_")][:max_topics]
+    for topic_key in topic_keys:
+        def open_topic(topic_key=topic_key):
+            app_test.session_state["current_topic"] = topic_key
+            return app_test.run()
+        record(f"topic:{topic_key}", open_topic)
+
+    def search():
+        app_test.session_state["current_topic"] = None
+        app_test.run()
+        search_box = next(box for box in app_test.text_input if box.label == "Enter search term:")
+        return search_box.input(search_term).run()
+    record("search", search)
+
+    # AppTest has no media server to call deferred downloads, so call the exports directly
+    os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+    sys.path.insert(0, ROOT)
+    import land_law_app
+
+    def file_size(export):
+        with export() as export_file:
+            export_file.seek(0, os.SEEK_END)
+            return export_file.tell()
+
+    for fmt in ("txt", "md", "html"):
+        record(f"export_notes:{fmt}", lambda fmt=fmt: file_size(lambda: land_law_app.export_notes(None, fmt)),
+               count_messages=False)
+    record("export_all_diagrams", lambda: file_size(land_law_app.export_all_diagrams), count_messages=False)
+    return results
+
+
+def run_scale(scale, args):
+    """Benchmark one corpus size in a fresh interpreter"""
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, STREAMLIT_LOGGER_LEVEL="error")
+        # Measure cold paths as a visitor without the background warm-up would see them
+        env.setdefault("LAND_LAW_WARMUP", "0")
+        if scale != 1:
+            env["LAND_LAW_CONTENT_DIR"] = build_corpus(scale, os.path.join(tmp, "content"))
+        command = [sys.executable, os.path.abspath(__file__), "--child",
+                   "--repeat", str(args.repeat), "--max-topics", str(args.max_topics),
+                   "--search", args.search]
+        result = subprocess.run(command, env=env, capture_output=True, text=True)
+        if result.returncode:
+            sys.stderr.write(result.stderr)
+            raise SystemExit(f"benchmark failed at scale {scale}")
+        # The child prints its JSON on the last line; anything before it is app output
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baseline, tolerance):
+    """Print per-path changes against a baseline; return the regressed paths"""
+    regressions = []
+    for scale, paths in results.items():
+        for path, entry in paths.items():
+            base = baseline.get(scale, {}).get(path)
+            if not base or "wall_ms" not in entry:
+                continue
+            for metric in ("wall_ms", "peak_kib", "message_bytes", "payload_bytes"):
+                if metric not in entry or not base.get(metric):
+                    continue
+                change = (entry[metric] - base[metric]) / base[metric]
+                flag = ""
+                if change > tolerance:
+                    flag = "  REGRESSION"
+                    regressions.append((scale, path, metric))
+                print(f"  x{scale:<5} {path:<32} {metric:<14} {base[metric]:>12.1f} -> "
+                      f"{entry[metric]:>12.1f} ({change:+.0%}){flag}")
+    return regressions
+
+
+def print_results(results):
+    for scale, paths in results.items():
+        print(f"\ncorpus x{scale}")
+        print(f"  {'path':<32} {'wall ms':>10} {'peak KiB':>10} {'bytes':>12}")
+        for path, entry in paths.items():
+            if "wall_ms" not in entry:
+                print(f"  {path:<32} failed: {entry['error']}")
+                continue
+            size = entry.get("message_bytes", entry.get("payload_bytes", 0))
+            note = f"  (error: {entry['error']})" if "error" in entry else ""
+            print(f"  {path:<32} {entry['wall_ms']:>10.1f} {entry['peak_kib']:>10.0f} {size:>12}{note}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", default="1", help="comma-separated corpus multipliers, e.g. 1,10,100,1000")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per path (median is reported)")
+    parser.add_argument("--max-topics", type=int, default=7, help="topic pages to visit per scale")
+    parser.add_argument("--search", default="covenant", help="search term for the search path")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against a previous --output file")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="relative increase over baseline counted as a regression")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        results = run_paths(args.repeat, args.max_topics, args.search)
+        print(json.dumps(results))
+        return 0
+
+    results = {}
+    for scale in (int(value) for value in args.scales.split(",")):
+        results[str(scale)] = run_scale(scale, args)
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": sys.version.split()[0],
+                       "results": results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        print(f"\ncompared with {args.baseline}")
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,508 @@
+"""Drive concurrent simulated sessions against a local server and report latency SLOs
+
+Usage:
+    python benchmarks/load_test.py --sessions 20 --duration 60
+    python benchmarks/load_test.py --sessions 50 --scale 10 --output load.json
+    python benchmarks/load_test.py --sessions 50 --baseline load.json --p95-slo-ms 500
+    python benchmarks/load_test.py --app serve.py  # warm caches at server start
+
+Starts `streamlit run land_law_app.py` (or the --app entry point) on a free
+localhost port, opens one websocket per simulated user and speaks
+Streamlit's protobuf protocol directly: each rerun is a BackMsg carrying
+widget states, and it is timed until the server's script_finished message.
+Users follow weighted scripts (browse topics, search, study flashcards,
+export) with think time between actions. The report gives throughput and p50/p95/p99 latency per action,
+the websocket bytes received per element type and the server's RSS
+(including any worker processes) sampled over time. Like a browser, each
+session reports the cacheable messages it holds, so unchanged large
+elements come back as references.
+
+A fixed --seed makes the action sequence repeatable, and results record
+the git commit, so runs can be compared across commits.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from itertools import count
+from urllib.parse import urljoin
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_app import APP_PATH, ROOT, build_corpus  # noqa: E402
+
+# Terminal script_finished statuses; FINISHED_EARLY_FOR_RERUN is followed by another run
+FINISHED = {ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY,
+            ForwardMsg.FINISHED_WITH_COMPILE_ERROR}
+
+SEARCH_TERMS = ("easement", "covenant", "tulk", "lease", "mortgage", "adverse possession", "registration")
+
+# Session scripts and how often each simulated user picks them
+SCRIPT_WEIGHTS = {"browse": 5, "search": 3, "study": 2, "export": 1}
+
+RUN_TIMEOUT = 60.0
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def process_rss_kib(pid):
+    """Resident memory of a process and all its descendants, from /proc"""
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/status", encoding="ascii") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1])
+                        break
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children", encoding="ascii") as f:
+                    pending.extend(int(child) for child in f.read().split())
+        except (OSError, ValueError):
+            continue
+    return total
+
+
+class Server:
+    """A `streamlit run` subprocess bound to a free localhost port"""
+
+    def __init__(self, env, app_path=APP_PATH):
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", app_path,
+             "--server.headless", "true", "--server.address", "127.0.0.1",
+             "--server.port", str(self.port), "--browser.gatherUsageStats", "false"],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+        )
+
+    def wait_ready(self, timeout=60, path="/_stcore/health"):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise SystemExit(f"server exited:\n{self.process.stderr.read().decode(errors='replace')}")
+            try:
+                with urllib.request.urlopen(f"{self.url}{path}", timeout=2) as response:
+                    if response.status == 200:
+                        return
+            except OSError:
+                time.sleep(0.2)
+        raise SystemExit("server did not become healthy")
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+class Session:
+    """One simulated browser tab"""
+
+    def __init__(self, server, rng, traffic, query_string=""):
+        self.server = server
+        self.rng = rng
+        # message kind -> [messages, bytes] received, shared by every session
+        self.traffic = traffic
+        # Hashes of cacheable messages; the browser reports these so the
+        # server can send a reference instead of an element it already has
+        self.cached_hashes = set()
+        self.query_string = query_string
+        self.websocket = None
+        self.session_id = None
+        # user key or label -> (widget id, fragment id, element type)
+        self.widgets = {}
+        # widget id -> WidgetState kept across reruns, as the browser does
+        self.values = {}
+        # download widget id -> deferred file id to request on click
+        self.downloads = {}
+        self.errors = 0
+        self._finished = None
+        self._responses = {}
+        self._request_ids = count(1)
+        self._reader = None
+
+    async def connect(self):
+        host = self.server.url.replace("http://", "ws://")
+        self.websocket = await websockets.connect(f"{host}/_stcore/stream", subprotocols=["streamlit"],
+                                                  max_size=None)
+        self._reader = asyncio.create_task(self._read())
+
+    async def close(self):
+        if self._reader:
+            self._reader.cancel()
+        if self.websocket:
+            await self.websocket.close()
+
+    async def _read(self):
+        async for data in self.websocket:
+            msg = ForwardMsg()
+            msg.ParseFromString(data)
+            kind = msg.WhichOneof("type")
+            self._count(msg, kind, len(data))
+            if msg.metadata.cacheable:
+                self.cached_hashes.add(msg.hash)
+            if kind == "new_session":
+                self.session_id = msg.new_session.initialize.session_id
+            elif kind == "delta":
+                self._track(msg.delta)
+            elif kind == "script_finished" and msg.script_finished in FINISHED:
+                if self._finished and not self._finished.done():
+                    self._finished.set_result(msg.script_finished)
+            elif kind == "backend_operation_response":
+                future = self._responses.pop(msg.backend_operation_response.request_id, None)
+                if future and not future.done():
+                    future.set_result(msg.backend_operation_response)
+
+    def _count(self, msg, kind, size):
+        if kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+            kind = msg.delta.new_element.WhichOneof("type")
+        counter = self.traffic.setdefault(kind, [0, 0])
+        counter[0] += 1
+        counter[1] += size
+
+    def _track(self, delta):
+        if delta.WhichOneof("type") != "new_element":
+            return
+        element = delta.new_element
+        kind = element.WhichOneof("type")
+        if kind == "exception":
+            self.errors += 1
+            return
+        proto = getattr(element, kind)
+        widget_id = getattr(proto, "id", "")
+        if not widget_id:
+            return
+        entry = (widget_id, delta.fragment_id, kind)
+        if kind == "download_button" and proto.deferred_file_id:
+            self.downloads[widget_id] = proto.deferred_file_id
+        # Keyed widget ids end in "-<user key>"; unkeyed ones are found by label
+        user_key = widget_id.split("-", 2)[-1]
+        if user_key and user_key != "None":
+            self.widgets[user_key] = entry
+        if getattr(proto, "label", ""):
+            self.widgets.setdefault(proto.label, entry)
+
+    async def rerun(self, trigger=None, fragment_id=""):
+        """Send a rerun with the current widget states (plus a one-off trigger); return seconds"""
+        back = BackMsg()
+        state = back.rerun_script
+        state.query_string = self.query_string
+        state.fragment_id = fragment_id
+        state.cached_message_hashes.extend(self.cached_hashes)
+        for value in self.values.values():
+            state.widget_states.widgets.add().CopyFrom(value)
+        if trigger is not None:
+            state.widget_states.widgets.add().CopyFrom(trigger)
+        self._finished = asyncio.get_running_loop().create_future()
+        start = time.perf_counter()
+        await self.websocket.send(back.SerializeToString())
+        await asyncio.wait_for(self._finished, RUN_TIMEOUT)
+        return time.perf_counter() - start
+
+    async def click(self, key):
+        widget_id, fragment_id, _ = self.widgets[key]
+        trigger = BackMsg().rerun_script.widget_states.widgets.add()
+        trigger.id = widget_id
+        trigger.trigger_value = True
+        return await self.rerun(trigger, fragment_id)
+
+    async def type_text(self, key, text):
+        widget_id, fragment_id, _ = self.widgets[key]
+        value = self.values.setdefault(widget_id, BackMsg().rerun_script.widget_states.widgets.add())
+        value.id = widget_id
+        value.string_value = text
+        return await self.rerun(fragment_id=fragment_id)
+
+    async def download(self, key):
+        """Request a deferred download and fetch the file it produces"""
+        start = time.perf_counter()
+        file_id = self.downloads[self.widgets[key][0]]
+        request_id = str(next(self._request_ids))
+        back = BackMsg()
+        back.backend_operation_request.request_id = request_id
+        back.backend_operation_request.session_id = self.session_id
+        back.backend_operation_request.deferred_file.file_id = file_id
+        future = self._responses[request_id] = asyncio.get_running_loop().create_future()
+        await self.websocket.send(back.SerializeToString())
+        response = await asyncio.wait_for(future, RUN_TIMEOUT)
+        if response.error_msg:
+            raise RuntimeError(response.error_msg)
+        await asyncio.to_thread(fetch, urljoin(f"{self.server.url}/", response.deferred_file.url))
+        return time.perf_counter() - start
+
+    def topic_keys(self):
+        """Topics offered by the sidebar navigator on the current page"""
+        return [key[4:] for key, (_, _, kind) in self.widgets.items()
+                if key.startswith("btn_") and kind == "button"]
+
+
+def fetch(url):
+    """Download a URL and return its size in bytes"""
+    size = 0
+    with urllib.request.urlopen(url, timeout=RUN_TIMEOUT) as response:
+        while chunk := response.read(1 << 16):
+            size += len(chunk)
+    return size
+
+
+async def browse(session, act):
+    """Open a few topics from the sidebar, then go back home"""
+    for topic_key in session.rng.sample(session.topic_keys(), k=min(3, len(session.topic_keys()))):
+        await act("open_topic", session.click(f"btn_{topic_key}"))
+    await act("back_home", session.click("← Back"))
+
+
+async def search(session, act):
+    """Type a search term a few characters at a time, as the box reruns on each change"""
+    term = session.rng.choice(SEARCH_TERMS)
+    for end in range(min(4, len(term)), len(term) + 1, 3):
+        await act("search", session.type_text("Enter search term:", term[:end]))
+    await act("search", session.type_text("Enter search term:", ""))
+
+
+async def study(session, act):
+    """Answer a few flashcards, then leave the flashcard page"""
+    await act("open_flashcards", session.click("open_flashcards"))
+    for _ in range(3):
+        if "Show answer" not in session.widgets:
+            break
+        await act("show_answer", session.click("Show answer"))
+        grade = session.rng.choice(["grade_Again", "grade_Good", "grade_Good", "grade_Easy"])
+        await act("grade_card", session.click(grade))
+    await act("back_home", session.click("← Back"))
+
+
+async def export(session, act):
+    """Download the notes and the diagram bundle"""
+    await act("export_notes", session.download("📄 Export Notes"))
+    await act("export_diagrams", session.download("📈 Export Diagrams"))
+
+
+SCRIPTS = {"browse": browse, "search": search, "study": study, "export": export}
+
+
+async def run_user(number, server, args, deadline, samples, errors, traffic):
+    """One simulated user: open the app, then run weighted scripts until the deadline"""
+    rng = random.Random(args.seed * 1000 + number)
+    session = Session(server, rng, traffic, query_string=f"learner=load{number}")
+    names = list(SCRIPT_WEIGHTS)
+    weights = [SCRIPT_WEIGHTS[name] for name in names]
+
+    async def act(action, step):
+        try:
+            seconds = await step
+        except (KeyError, RuntimeError, OSError, asyncio.TimeoutError,
+                websockets.exceptions.WebSocketException) as exc:
+            errors.append((action, f"{type(exc).__name__}: {exc}"))
+            return
+        samples.append((time.monotonic(), action, seconds))
+        await asyncio.sleep(rng.uniform(0, 2 * args.think))
+
+    # Stagger arrivals so sessions do not all open in the same instant
+    await asyncio.sleep(rng.uniform(0, args.ramp))
+    try:
+        await session.connect()
+        await act("open_app", session.rerun())
+        while time.monotonic() < deadline:
+            script = rng.choices(names, weights)[0]
+            await SCRIPTS[script](session, act)
+    except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException) as exc:
+        errors.append(("connect", f"{type(exc).__name__}: {exc}"))
+    finally:
+        if session.errors:
+            errors.extend([("page", "exception element rendered")] * session.errors)
+        await session.close()
+
+
+async def sample_rss(pid, deadline, interval, rss):
+    start = time.monotonic()
+    while time.monotonic() < deadline:
+        rss.append((round(time.monotonic() - start, 1), process_rss_kib(pid)))
+        await asyncio.sleep(interval)
+
+
+async def run_load(server, args):
+    samples, errors, rss, traffic = [], [], [], {}
+    start = time.monotonic()
+    deadline = start + args.ramp + args.duration
+    await asyncio.gather(
+        sample_rss(server.process.pid, deadline, args.rss_interval, rss),
+        *(run_user(number, server, args, deadline, samples, errors, traffic) for number in range(args.sessions))
+    )
+    return start, samples, errors, rss, traffic
+
+
+def summarize(start, samples, errors, rss, traffic, args):
+    """Latency percentiles per action and overall, throughput, websocket traffic and memory"""
+    # Reruns during ramp-up are still recorded, but throughput counts the steady window only
+    measured = [seconds for at, _, seconds in samples if at >= start + args.ramp]
+    actions = {}
+    for _, action, seconds in samples:
+        actions.setdefault(action, []).append(seconds * 1000)
+    actions["all"] = [seconds * 1000 for _, _, seconds in samples]
+
+    def latency(values):
+        return {"count": len(values), "p50_ms": percentile(values, 0.50), "p95_ms": percentile(values, 0.95),
+                "p99_ms": percentile(values, 0.99), "max_ms": max(values), "mean_ms": statistics.fmean(values)}
+
+    error_counts = {}
+    for action, message in errors:
+        error_counts[f"{action}: {message}"] = error_counts.get(f"{action}: {message}", 0) + 1
+    rss_values = [kib for _, kib in rss] or [0]
+    return {
+        "throughput_per_s": len(measured) / args.duration,
+        "actions": {action: latency(values) for action, values in actions.items() if values},
+        "errors": error_counts,
+        "received_bytes": sum(size for _, size in traffic.values()),
+        "traffic": {kind: {"messages": messages, "bytes": size}
+                    for kind, (messages, size) in sorted(traffic.items(), key=lambda item: -item[1][1])},
+        "rss_kib": {"start": rss_values[0], "peak": max(rss_values), "end": rss_values[-1], "samples": rss},
+    }
+
+
+def compare(summary, baseline, tolerance):
+    """Print per-action changes against a baseline; return the regressed metrics"""
+    regressions = []
+    metrics = [(action, metric) for action in summary["actions"] for metric in ("p50_ms", "p95_ms", "p99_ms")]
+    totals = [(None, "throughput_per_s"), (None, "received_bytes"), (None, "peak_rss_kib")]
+    for action, metric in metrics + totals:
+        if action:
+            current = summary["actions"][action][metric]
+            previous = baseline["actions"].get(action, {}).get(metric)
+        elif metric == "peak_rss_kib":
+            current, previous = summary["rss_kib"]["peak"], baseline["rss_kib"]["peak"]
+        else:
+            current, previous = summary[metric], baseline.get(metric)
+        if not previous:
+            continue
+        change = (current - previous) / previous
+        # Lower throughput is the regression; for everything else it is higher values
+        worse = -change if metric == "throughput_per_s" else change
+        flag = ""
+        if worse > tolerance:
+            flag = "  REGRESSION"
+            regressions.append((action, metric))
+        print(f"  {action or '-':<18} {metric:<16} {previous:>10.1f} -> {current:>10.1f} ({change:+.0%}){flag}")
+    return regressions
+
+
+def print_summary(summary, args):
+    print(f"\n{args.sessions} sessions for {args.duration:.0f}s: "
+          f"{summary['throughput_per_s']:.1f} reruns/s")
+    print(f"  {'action':<18} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for action, entry in sorted(summary["actions"].items(), key=lambda item: item[0] == "all"):
+        print(f"  {action:<18} {entry['count']:>6} {entry['p50_ms']:>9.1f} {entry['p95_ms']:>9.1f} "
+              f"{entry['p99_ms']:>9.1f} {entry['max_ms']:>9.1f}")
+    rss = summary["rss_kib"]
+    print(f"  server RSS: {rss['start'] / 1024:.0f} MiB at start, {rss['peak'] / 1024:.0f} MiB peak, "
+          f"{rss['end'] / 1024:.0f} MiB at end")
+    print(f"  websocket bytes received: {summary['received_bytes'] / 1024:.0f} KiB "
+          f"({summary['received_bytes'] / max(1, summary['actions']['all']['count']) / 1024:.1f} KiB per rerun)")
+    for kind, entry in list(summary["traffic"].items())[:8]:
+        print(f"    {kind:<24} {entry['messages']:>7} messages {entry['bytes'] / 1024:>9.1f} KiB")
+    for error, times in summary["errors"].items():
+        print(f"  error x{times}: {error}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10, help="concurrent simulated users")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of steady load after ramp-up")
+    parser.add_argument("--ramp", type=float, default=5, help="seconds over which sessions connect")
+    parser.add_argument("--think", type=float, default=0.5, help="mean think time between actions, seconds")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the simulated users' choices")
+    parser.add_argument("--scale", type=int, default=1, help="serve a synthetic corpus this many times larger")
+    parser.add_argument("--app", default=os.path.basename(APP_PATH), choices=("land_law_app.py", "serve.py"),
+                        help="entry point to serve; serve.py warms the caches at server start")
+    parser.add_argument("--rss-interval", type=float, default=1.0, help="seconds between RSS samples")
+    parser.add_argument("--p95-slo-ms", type=float, help="fail if the overall p95 latency exceeds this")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against a previous --output file")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="relative change over baseline counted as a regression")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Each run gets its own review database and export cache, so runs start alike
+        env = dict(os.environ, STREAMLIT_LOGGER_LEVEL="error",
+                   LAND_LAW_FLASHCARD_DB=os.path.join(tmp, "flashcards.db"),
+                   LAND_LAW_EXPORT_DIR=os.path.join(tmp, "exports"))
+        if args.scale != 1:
+            env["LAND_LAW_CONTENT_DIR"] = build_corpus(args.scale, os.path.join(tmp, "content"))
+        server = Server(env, os.path.join(ROOT, args.app))
+        try:
+            server.wait_ready()
+            if args.app == "serve.py":
+                # Start the load once the caches are warm (the endpoint answers 503 until then)
+                server.wait_ready(path="/warmup")
+            start, samples, errors, rss, traffic = asyncio.run(run_load(server, args))
+        finally:
+            server.stop()
+
+    if not samples:
+        raise SystemExit(f"no rerun completed; errors: {errors[:5]}")
+    summary = summarize(start, samples, errors, rss, traffic, args)
+    print_summary(summary, args)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": git_commit(),
+                       "python": sys.version.split()[0], "config": vars(args), **summary}, f, indent=2)
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\ncompared with {args.baseline} (commit {baseline.get('commit')})")
+        differing = [name for name in ("sessions", "duration", "ramp", "think", "seed", "scale", "app")
+                     if baseline.get("config", {}).get(name) != getattr(args, name)]
+        if differing:
+            print(f"  warning: baseline was run with different {', '.join(differing)}")
+        if compare(summary, baseline, args.tolerance):
+            status = 1
+    if args.p95_slo_ms is not None:
+        p95 = summary["actions"]["all"]["p95_ms"]
+        verdict = "met" if p95 <= args.p95_slo_ms else "MISSED"
+        print(f"\np95 SLO {args.p95_slo_ms:.0f} ms {verdict}: {p95:.1f} ms")
+        if p95 > args.p95_slo_ms:
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
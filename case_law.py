@@ -0,0 +1,170 @@
+"""Structured case law: one record per case, indexed by year, topic and text
+
+Cases live in content/cases.json as records like
+
+    {"name": "Tulk v Moxhay", "year": 1848, "topics": ["covenants"],
+     "holding": "Established restrictive covenants in equity"}
+
+CaseIndex keeps every case in one list sorted by year. A year range is a
+bisect over that list and yields a contiguous run of positions. Each topic
+and each term keeps a sorted list of positions. A query clips every list it
+touches to the year range by bisect, before the lists of a prefix's stems
+are merged, then walks the shortest list and gallops through the others.
+Work grows with the parts of the lists inside the range, not the corpus.
+"""
+
+import json
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from itertools import islice
+
+from search_index import STOPWORDS, stem, tokenize
+
+Case = namedtuple("Case", "name year topics holding")
+
+REQUIRED_CASE_FIELDS = ("name", "year", "topics", "holding")
+
+
+def validate_case(position, record, topic_keys=None):
+    """Return a list of problems with one case record (empty when it is valid)"""
+    label = record.get("name") if isinstance(record, dict) and isinstance(record.get("name"), str) else None
+    label = f"case {position} ({label})" if label else f"case {position}"
+    if not isinstance(record, dict):
+        return [f"{label}: must be an object"]
+    problems = [f"missing field '{field}'" for field in REQUIRED_CASE_FIELDS if field not in record]
+    if problems:
+        return [f"{label}: {problem}" for problem in problems]
+    if not isinstance(record["name"], str) or not record["name"].strip():
+        problems.append("'name' must be a non-empty string")
+    if not isinstance(record["year"], int) or isinstance(record["year"], bool):
+        problems.append("'year' must be an integer")
+    if not isinstance(record["holding"], str):
+        problems.append("'holding' must be a string")
+    topics = record["topics"]
+    if not isinstance(topics, list) or not all(isinstance(topic, str) for topic in topics):
+        problems.append("'topics' must be a list of topic keys")
+    elif topic_keys is not None:
+        problems += [f"unknown topic '{topic}'" for topic in topics if topic not in topic_keys]
+    return [f"{label}: {problem}" for problem in problems]
+
+
+def read_cases(path):
+    """Case records from a cases file; a missing file is an empty corpus"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)["cases"]
+    except FileNotFoundError:
+        return []
+
+
+def case_markdown(case):
+    """One case as a Markdown list item, the form topic pages and flashcards read"""
+    return f"- *{case.name}* ({case.year}): {case.holding}"
+
+
+def _terms(text):
+    return [stem(word) for word, _, _ in tokenize(text)]
+
+
+def _clip(positions, lo, hi):
+    """The part of an ascending position list within [lo, hi)"""
+    return positions[bisect_left(positions, lo):bisect_left(positions, hi)]
+
+
+def _gallop(positions, position, cursor):
+    """Index of the first entry >= position at or after cursor, probing 1, 2, 4... ahead first"""
+    step, hi = 1, cursor
+    while hi < len(positions) and positions[hi] < position:
+        cursor, hi, step = hi + 1, hi + step, step * 2
+    return bisect_left(positions, position, cursor, min(hi, len(positions)))
+
+
+def _intersect(lists):
+    """Ascending positions in every list, walking the shortest and galloping through the rest"""
+    lists = sorted(lists, key=len)
+    shortest, others = lists[0], lists[1:]
+    # Each list keeps a cursor that only moves forward, so the search for the next position
+    # starts where the last one stopped and costs the log of the distance skipped
+    cursors = [0] * len(others)
+    for position in shortest:
+        for i, positions in enumerate(others):
+            cursor = cursors[i]
+            if cursor < len(positions) and positions[cursor] < position:
+                cursor = cursors[i] = _gallop(positions, position, cursor + 1)
+            if cursor == len(positions):
+                return
+            if positions[cursor] != position:
+                break
+        else:
+            yield position
+
+
+class CaseIndex:
+    """Cases sorted by year with per-topic and per-term position lists"""
+
+    def __init__(self, records=()):
+        cases = [Case(record["name"], record["year"], tuple(record["topics"]), record["holding"])
+                 for record in records]
+        cases.sort(key=lambda case: (case.year, case.name))
+        self.cases = cases
+        self.years = [case.year for case in cases]
+        # topic key -> ascending positions; stem -> ascending positions
+        self.by_topic = {}
+        self.postings = {}
+        for position, case in enumerate(cases):
+            for topic in case.topics:
+                self.by_topic.setdefault(topic, []).append(position)
+            for term in dict.fromkeys(_terms(f"{case.name} {case.holding}")):
+                self.postings.setdefault(term, []).append(position)
+        self.vocabulary = sorted(self.postings)
+
+    def __len__(self):
+        return len(self.cases)
+
+    @property
+    def first_year(self):
+        return self.years[0] if self.years else None
+
+    @property
+    def last_year(self):
+        return self.years[-1] if self.years else None
+
+    def year_range(self, start=None, end=None):
+        """Positions [lo, hi) of the cases decided from start to end, inclusive"""
+        lo = 0 if start is None else bisect_left(self.years, start)
+        hi = len(self.years) if end is None else bisect_right(self.years, end)
+        return lo, max(lo, hi)
+
+    def for_topic(self, topic_key):
+        """A topic's cases, oldest first"""
+        return [self.cases[position] for position in self.by_topic.get(topic_key, ())]
+
+    def topic_markdown(self, topic_key):
+        return "\n".join(case_markdown(case) for case in self.for_topic(topic_key))
+
+    def _term_positions(self, term, lo, hi):
+        """Ascending positions in [lo, hi) of cases containing any indexed stem starting with term"""
+        first = bisect_left(self.vocabulary, term)
+        last = bisect_left(self.vocabulary, term + "\uffff", first)
+        # Clip each stem's list to the range before merging, so the merge only sees cases in range
+        lists = [_clip(self.postings[word], lo, hi) for word in self.vocabulary[first:last]]
+        if len(lists) == 1:
+            return lists[0]
+        return sorted({position for positions in lists for position in positions})
+
+    def query(self, text="", topic=None, start=None, end=None, limit=None):
+        """Cases matching every query word (as a prefix), the topic and the year range, oldest first"""
+        lo, hi = self.year_range(start, end)
+        lists = []
+        if topic is not None:
+            lists.append(_clip(self.by_topic.get(topic, []), lo, hi))
+        terms = _terms(text)
+        content_terms = [term for term in terms if term not in STOPWORDS] or terms
+        lists += [self._term_positions(term, lo, hi) for term in dict.fromkeys(content_terms)]
+        positions = _intersect(lists) if lists else range(lo, hi)
+        return [self.cases[position] for position in islice(positions, limit)]
+
+    def count(self, start=None, end=None):
+        """Number of cases decided from start to end, inclusive, without touching them"""
+        lo, hi = self.year_range(start, end)
+        return hi - lo
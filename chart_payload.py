@@ -0,0 +1,161 @@
+"""Compact Plotly figure specs for sending charts over the websocket
+
+A serialized figure carries its whole layout template: every trace type's
+defaults, colour scales and axis styles for subplots the chart never draws.
+slim_figure() keeps only the parts of the template a figure can use, shares
+identical pruned templates between figures, rounds numbers to display
+precision and packs long numeric arrays as base64 typed arrays, which
+plotly.js decodes natively. NumPy is only imported once a figure is
+compacted, so importing this module stays cheap.
+
+st.plotly_chart validates a dict spec through go.Figure on every call but
+sends a Figure as is, so cached specs are wrapped once by spec_figure().
+"""
+
+import base64
+import json
+import math
+from functools import lru_cache
+
+# Significant digits kept for floats; more than a chart can show
+FLOAT_DIGITS = 6
+
+# Numeric arrays at least this long are sent as typed arrays; shorter ones
+# are smaller as plain JSON lists
+TYPED_ARRAY_MIN = 16
+
+# Subplot layout keys a trace type draws into; unlisted types are cartesian
+TRACE_SUBPLOTS = {
+    "pie": (), "sunburst": (), "treemap": (), "icicle": (), "funnelarea": (),
+    "sankey": (), "table": (), "indicator": (),
+    "barpolar": ("polar",), "scatterpolar": ("polar",), "scatterpolargl": ("polar",),
+    "scatterternary": ("ternary",), "scattersmith": ("smith",),
+    "scattergeo": ("geo",), "choropleth": ("geo",),
+    "scattermap": ("map",), "choroplethmap": ("map",), "densitymap": ("map",),
+    "scattermapbox": ("mapbox",), "choroplethmapbox": ("mapbox",), "densitymapbox": ("mapbox",),
+    "scatter3d": ("scene",), "surface": ("scene",), "mesh3d": ("scene",), "cone": ("scene",),
+    "streamtube": ("scene",), "volume": ("scene",), "isosurface": ("scene",),
+}
+CARTESIAN = ("xaxis", "yaxis")
+SUBPLOT_KEYS = {"xaxis", "yaxis", "polar", "ternary", "smith", "geo", "map", "mapbox", "scene"}
+
+# Template defaults for layout items, kept only when the figure has such items
+ITEM_DEFAULTS = {"annotationdefaults": "annotations", "shapedefaults": "shapes", "imagedefaults": "images",
+                 "sliderdefaults": "sliders", "updatemenudefaults": "updatemenus", "selectiondefaults": "selections"}
+LAYOUT_ITEMS = frozenset(ITEM_DEFAULTS.values())
+
+# Template layout keys that only matter when something uses a colour scale
+COLORSCALE_KEYS = {"coloraxis", "colorscale"}
+COLORSCALE_MARKERS = ('"colorscale"', '"coloraxis"', '"showscale"')
+
+# Integer typed arrays plotly.js decodes, narrowest first; it has no 64-bit integers, so wider
+# values go as float64, which is exact up to 2**53
+TYPED_DTYPES = (("int8", "i1"), ("int16", "i2"), ("int32", "i4"), ("uint32", "u4"))
+
+
+def _round(value):
+    """Round a float to FLOAT_DIGITS significant digits, as an int when whole"""
+    if isinstance(value, float) and math.isfinite(value):
+        value = float(f"{value:.{FLOAT_DIGITS}g}")
+        if value.is_integer() and abs(value) < 2 ** 53:
+            return int(value)
+    return value
+
+
+def _typed_array(array):
+    """plotly.js typed-array spec in the narrowest dtype that keeps every value exactly"""
+    import numpy as np
+    if np.issubdtype(array.dtype, np.floating) and np.all(np.isfinite(array)) \
+            and np.array_equal(array, np.round(array)) and np.all(np.abs(array) <= 2 ** 53):
+        array = array.astype(np.int64)
+    if np.issubdtype(array.dtype, np.integer):
+        for dtype, code in TYPED_DTYPES:
+            info = np.iinfo(dtype)
+            if info.min <= array.min() and array.max() <= info.max:
+                return {"dtype": code, "bdata": base64.b64encode(array.astype(f"<{code}").tobytes()).decode("ascii")}
+    # float32 only when it round-trips every value; otherwise the full float64
+    single = array.astype("<f4")
+    if np.array_equal(single.astype(np.float64), array.astype(np.float64), equal_nan=True):
+        return {"dtype": "f4", "bdata": base64.b64encode(single.tobytes()).decode("ascii")}
+    return {"dtype": "f8", "bdata": base64.b64encode(array.astype("<f8").tobytes()).decode("ascii")}
+
+
+def compact(value):
+    """Copy of a plotly JSON structure with compact numbers and no empty entries"""
+    import numpy as np
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            item = compact(item)
+            if item is None or item == {}:
+                continue
+            result[key] = item
+        return result
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind in "iuf" and value.ndim == 1 and len(value) >= TYPED_ARRAY_MIN:
+            return _typed_array(value)
+        value = value.tolist()
+    if isinstance(value, (list, tuple)):
+        numeric = [isinstance(item, (int, float)) and not isinstance(item, bool) for item in value]
+        if len(value) >= TYPED_ARRAY_MIN and all(numeric):
+            return _typed_array(np.asarray(value, dtype=float))
+        return [compact(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    return _round(value)
+
+
+@lru_cache(maxsize=64)
+def _pruned_template(template_json, trace_types, layout_keys, colorscales):
+    """The parts of a template a figure can use; cached so equal results are one shared dict"""
+    template = json.loads(template_json)
+    data = {trace_type: defaults for trace_type, defaults in template.get("data", {}).items()
+            if trace_type in trace_types}
+    layout = {key: value for key, value in template.get("layout", {}).items()
+              if (key not in SUBPLOT_KEYS or key in layout_keys)
+              and (key not in ITEM_DEFAULTS or ITEM_DEFAULTS[key] in layout_keys)
+              and (key not in COLORSCALE_KEYS or colorscales)}
+    pruned = {}
+    if data:
+        pruned["data"] = data
+    if layout:
+        pruned["layout"] = layout
+    return pruned
+
+
+def slim_figure(fig):
+    """A compact dict spec of a Plotly figure for st.plotly_chart
+
+    The template is always kept explicitly, even when pruned to nothing, so
+    the default template is not added back when the spec is sent.
+    """
+    spec = fig.to_plotly_json()
+    layout = dict(spec.get("layout", {}))
+    template = layout.pop("template", None) or {}
+    if hasattr(template, "to_plotly_json"):
+        template = template.to_plotly_json()
+    spec = compact({"data": spec.get("data", []), "layout": layout})
+    # compact() drops an empty layout, but the template is added back to it below
+    spec.setdefault("layout", {})
+
+    trace_types = frozenset(trace.get("type", "scatter") for trace in spec["data"])
+    # Only the keys pruning looks at, so figures of one kind share a cache entry
+    layout_keys = frozenset(key for trace_type in trace_types for key in TRACE_SUBPLOTS.get(trace_type, CARTESIAN))
+    layout_keys |= LAYOUT_ITEMS.intersection(spec["layout"])
+    body = json.dumps(spec, separators=(",", ":"))
+    colorscales = any(marker in body for marker in COLORSCALE_MARKERS)
+    template_json = json.dumps(compact(template), sort_keys=True, separators=(",", ":"))
+    spec["layout"]["template"] = _pruned_template(template_json, trace_types, layout_keys, colorscales)
+    return spec
+
+
+def spec_figure(spec):
+    """Validate a compact spec once into the Figure that st.plotly_chart sends without re-validating"""
+    import plotly.graph_objects as go
+    return go.Figure(spec)
+
+
+def spec_bytes(spec):
+    """Size of a figure spec as it is sent to the browser"""
+    from plotly.io import to_json
+    return len(to_json(spec, validate=False).encode("utf-8"))
@@ -0,0 +1,144 @@
+"""Immutable in-memory topic model and the memory-mapped corpus snapshot
+
+Topics are frozen, slotted dataclasses whose lists are tuples and whose
+mappings are read-only views, so one instance can be shared by every
+session without defensive copies. The snapshot packs every topic of a
+content version into one read-only file; each server process maps it with
+mmap, so the bytes live once in the host's page cache however many
+processes serve the app.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from dataclasses import dataclass
+from types import MappingProxyType
+
+# Strings up to this length are interned, so repeated labels share one object
+INTERN_MAX = 80
+
+SNAPSHOT_MAGIC = b"LLSNAP01"
+# magic, topic count, offset of the index
+HEADER = struct.Struct("<8sIQ")
+# key offset, key length, record offset, record length
+INDEX_ENTRY = struct.Struct("<QIQI")
+
+
+def freeze(value):
+    """Recursively turn lists into tuples and dicts into read-only mappings"""
+    if isinstance(value, dict):
+        return MappingProxyType({sys.intern(k): freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, str) and len(value) <= INTERN_MAX:
+        return sys.intern(value)
+    return value
+
+
+def thaw(value):
+    """Inverse of freeze: plain dicts and lists, e.g. for pickling or JSON"""
+    if isinstance(value, MappingProxyType):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class Topic:
+    key: str
+    title: str
+    definition: str
+    key_points: tuple
+    diagram_data: MappingProxyType
+    explanation: str = ""
+    cases: str = ""
+    order: int = 0
+    complexity: int = 0
+
+    @classmethod
+    def from_dict(cls, key, data):
+        """Build a frozen topic from the dict stored in a topic file"""
+        return cls(
+            key=sys.intern(key),
+            title=sys.intern(data["title"]),
+            definition=data["definition"],
+            key_points=freeze(data["key_points"]),
+            diagram_data=freeze(data["diagram_data"]),
+            explanation=data.get("explanation", ""),
+            cases=data.get("cases", ""),
+            order=data.get("order", 0),
+            complexity=data.get("complexity", 0)
+        )
+
+
+def encode_record(data):
+    """Compact UTF-8 JSON for one topic's dict"""
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class Snapshot:
+    """Read-only, memory-mapped file holding every topic record of one content version"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self._index_offset = HEADER.unpack_from(self._map, 0)
+        if magic != SNAPSHOT_MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a content snapshot")
+
+    @staticmethod
+    def write(path, records):
+        """Write (key, record bytes) pairs to path atomically"""
+        records = sorted((key.encode("utf-8"), record) for key, record in records)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(b"\0" * HEADER.size)
+            index = []
+            for key, record in records:
+                key_offset = f.tell()
+                f.write(key)
+                record_offset = f.tell()
+                f.write(record)
+                index.append(INDEX_ENTRY.pack(key_offset, len(key), record_offset, len(record)))
+            index_offset = f.tell()
+            f.write(b"".join(index))
+            f.seek(0)
+            f.write(HEADER.pack(SNAPSHOT_MAGIC, len(records), index_offset))
+        os.replace(tmp_path, path)
+
+    def _entry(self, i):
+        return INDEX_ENTRY.unpack_from(self._map, self._index_offset + i * INDEX_ENTRY.size)
+
+    def _key(self, i):
+        key_offset, key_length, _, _ = self._entry(i)
+        return self._map[key_offset:key_offset + key_length]
+
+    def raw(self, key):
+        """Record bytes for a topic key, found by binary search over the sorted index"""
+        target = key.encode("utf-8")
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and self._key(low) == target:
+            _, _, record_offset, record_length = self._entry(low)
+            return self._map[record_offset:record_offset + record_length]
+        return None
+
+    def get(self, key):
+        """Decode one topic; only this record's pages are touched"""
+        record = self.raw(key)
+        if record is None:
+            raise KeyError(key)
+        return Topic.from_dict(key, json.loads(record))
+
+    def close(self):
+        self._map.close()
@@ -0,0 +1,381 @@
+"""On-disk content store: one JSON file per topic plus a lightweight manifest
+
+Topic bodies are served from a memory-mapped snapshot of the current content
+version (see content_model.Snapshot) and decoded into frozen Topic objects
+on first use. Case law lives in content/cases.json and is indexed by
+case_law.CaseIndex; each topic's cases are merged into its body on load.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import replace
+
+from case_law import CaseIndex, read_cases, validate_case
+from content_model import Snapshot, Topic, encode_record
+from diagrams import validate_chart
+
+CONTENT_DIR = os.environ.get(
+    "LAND_LAW_CONTENT_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "content")
+)
+
+# Set to 0 to read topic files directly instead of through the shared snapshot
+USE_SNAPSHOT = os.environ.get("LAND_LAW_CONTENT_SNAPSHOT", "1") not in ("0", "false")
+
+# Bumped whenever manifest entries gain or change fields, so old manifest files are ignored
+MANIFEST_FORMAT = 4
+
+# Fields every topic file must provide
+REQUIRED_FIELDS = ("title", "definition", "key_points", "diagram_data")
+
+# Navigation group for topics that don't name one
+DEFAULT_CATEGORY = "General"
+
+logger = logging.getLogger(__name__)
+
+
+class ContentError(ValueError):
+    """One or more topic or case files are missing fields or have the wrong shape"""
+
+
+def json_hash(value):
+    """Stable SHA-256 of a JSON-serializable value"""
+    payload = json.dumps(value, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def validate_topic(topic_key, topic):
+    """Return a list of problems with one topic's fields (empty when it is valid)"""
+    problems = [f"missing field '{field}'" for field in REQUIRED_FIELDS if field not in topic]
+    if problems:
+        return [f"{topic_key}: {problem}" for problem in problems]
+    if not isinstance(topic["title"], str) or not topic["title"].strip():
+        problems.append("'title' must be a non-empty string")
+    if not isinstance(topic["definition"], str):
+        problems.append("'definition' must be a string")
+    if not isinstance(topic["key_points"], list) or not all(isinstance(p, str) for p in topic["key_points"]):
+        problems.append("'key_points' must be a list of strings")
+    for field in ("explanation", "cases", "category"):
+        if not isinstance(topic.get(field, ""), str):
+            problems.append(f"'{field}' must be a string")
+    complexity = topic.get("complexity")
+    if complexity is not None and (not isinstance(complexity, int) or not 1 <= complexity <= 5):
+        problems.append("'complexity' must be an integer from 1 to 5")
+    diagram_data = topic["diagram_data"]
+    if not isinstance(diagram_data, dict):
+        problems.append("'diagram_data' must be an object")
+    else:
+        lengths = {len(value) for value in diagram_data.values() if isinstance(value, list)}
+        if len(lengths) > 1:
+            problems.append("'diagram_data' series must all have the same length")
+        problems += validate_chart(diagram_data)
+    return [f"{topic_key}: {problem}" for problem in problems]
+
+
+def word_count(text):
+    return len(text.split())
+
+
+def estimate_complexity(words):
+    """Fallback 1-5 rating for topics without an editorial complexity score"""
+    return max(1, min(5, 1 + words // 150))
+
+
+def manifest_entry(topic, stat):
+    """Summary of a topic kept in the manifest so listings never open topic files"""
+    words = (word_count(topic["definition"])
+             + sum(word_count(point) for point in topic["key_points"])
+             + word_count(topic.get("explanation", ""))
+             + word_count(topic.get("cases", "")))
+    return {
+        "order": topic.get("order", 0),
+        "title": topic["title"],
+        "key_points": len(topic["key_points"]),
+        "words": words,
+        "complexity": topic.get("complexity") or estimate_complexity(words),
+        "category": topic.get("category") or DEFAULT_CATEGORY,
+        "has_diagram": bool(topic["diagram_data"]),
+        "has_explanation": bool(topic.get("explanation")),
+        "has_cases": bool(topic.get("cases")),
+        "diagram_hash": json_hash(topic["diagram_data"]),
+        "content_hash": json_hash(topic),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size
+    }
+
+
+class CorpusManifest:
+    """Column-oriented summary of every topic in one content version"""
+
+    COLUMNS = ("title", "key_points", "words", "complexity", "category",
+               "has_diagram", "has_explanation", "has_cases")
+
+    def __init__(self, version, entries, case_topics=()):
+        self.version = version
+        self.keys = tuple(entries)
+        self.columns = {name: tuple(entry[name] for entry in entries.values()) for name in self.COLUMNS}
+        # Topics with indexed case law have cases even when their files carry none
+        self.columns["has_cases"] = tuple(has or key in case_topics
+                                          for key, has in zip(self.keys, self.columns["has_cases"]))
+        self.total_topics = len(self.keys)
+        self.total_key_points = sum(self.columns["key_points"])
+        self.total_words = sum(self.columns["words"])
+        # Categories in order of their first topic, and topic positions grouped by category
+        self.categories = tuple(dict.fromkeys(self.columns["category"]))
+        rank = {category: i for i, category in enumerate(self.categories)}
+        self.grouped = tuple(sorted(range(self.total_topics), key=lambda i: rank[self.columns["category"][i]]))
+        self._folded_titles = tuple(title.casefold() for title in self.columns["title"])
+        self._table = None
+
+    def filter(self, text="", category=None):
+        """Positions of topics whose title contains text, grouped by category"""
+        text = text.strip().casefold()
+        return [i for i in self.grouped
+                if (category is None or self.columns["category"][i] == category)
+                and text in self._folded_titles[i]]
+
+    def table(self):
+        """Homepage overview table, built once and shared by every session"""
+        if self._table is None:
+            import pandas as pd
+            self._table = pd.DataFrame({
+                'Topic': self.columns["title"],
+                'Key Points': self.columns["key_points"],
+                'Words': self.columns["words"],
+                'Complexity': self.columns["complexity"]
+            })
+        return self._table
+
+
+class ContentStore:
+    """Reads topics from content/topics/*.json, loading full bodies lazily"""
+
+    def __init__(self, root=CONTENT_DIR, cache_size=256, reload_interval=2.0, use_snapshot=USE_SNAPSHOT):
+        self.topics_dir = os.path.join(root, "topics")
+        self.manifest_path = os.path.join(root, "manifest.json")
+        self.cases_path = os.path.join(root, "cases.json")
+        self.snapshot_dir = os.path.join(root, ".snapshots")
+        self.use_snapshot = use_snapshot
+        self._snapshot = None
+        self.cache_size = cache_size
+        self.reload_interval = reload_interval
+        self._lock = threading.RLock()
+        # topic key -> manifest entry, in display order
+        self._manifest = OrderedDict()
+        # topic key -> (mtime_ns, frozen Topic), least recently used first
+        self._cache = OrderedDict()
+        self._checked_at = None
+        self._corpus = None
+        self._cases = CaseIndex()
+        # (mtime_ns, size) of cases.json behind the current case index, and a hash of it
+        self._cases_stat = None
+        self.cases_version = json_hash(None)
+        self._last_error = None
+        self.version = None
+        self._load_manifest()
+        self.refresh(force=True)
+
+    def _topic_path(self, topic_key):
+        return os.path.join(self.topics_dir, f"{topic_key}.json")
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(saved, dict) and saved.get("format") == MANIFEST_FORMAT:
+            self._manifest = OrderedDict(saved["entries"])
+
+    def _save_manifest(self):
+        tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"format": MANIFEST_FORMAT, "entries": list(self._manifest.items())}, f)
+            os.replace(tmp_path, self.manifest_path)
+        except OSError:
+            # A read-only content directory still works, it just rescans on start
+            pass
+
+    def _read_topic(self, topic_key):
+        with open(self._topic_path(topic_key), encoding="utf-8") as f:
+            return json.load(f)
+
+    def refresh(self, force=False):
+        """Pick up added, changed and deleted topic files (at most once per interval)"""
+        now = time.monotonic()
+        if not force and self._checked_at is not None and now - self._checked_at < self.reload_interval:
+            return False
+        with self._lock:
+            self._checked_at = now
+            stats = {}
+            for entry in os.scandir(self.topics_dir):
+                if entry.name.endswith(".json") and entry.is_file():
+                    try:
+                        stats[entry.name[:-5]] = entry.stat()
+                    except FileNotFoundError:
+                        # Deleted while the directory was being listed
+                        continue
+
+            changed = set()
+            manifest = {}
+            problems = []
+            for topic_key, stat in list(stats.items()):
+                entry = self._manifest.get(topic_key)
+                if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                    manifest[topic_key] = entry
+                    continue
+                # New or edited file: parse and validate it once to refresh its manifest entry
+                try:
+                    topic = self._read_topic(topic_key)
+                except ValueError as exc:
+                    problems.append(f"{topic_key}: invalid JSON ({exc})")
+                    continue
+                except OSError:
+                    # Deleted (or made unreadable) since the directory was listed: the topic is gone
+                    del stats[topic_key]
+                    continue
+                topic_problems = validate_topic(topic_key, topic)
+                if topic_problems:
+                    problems.extend(topic_problems)
+                    continue
+                manifest[topic_key] = manifest_entry(topic, stat)
+                changed.add(topic_key)
+            removed = self._manifest.keys() - stats.keys()
+            changed |= removed
+
+            try:
+                cases_stat = os.stat(self.cases_path)
+                cases_stat = (cases_stat.st_mtime_ns, cases_stat.st_size)
+            except FileNotFoundError:
+                cases_stat = None
+            cases = None
+            if cases_stat != self._cases_stat or changed:
+                # Re-check case tags against the topics that now exist
+                try:
+                    records = read_cases(self.cases_path)
+                except (ValueError, KeyError, TypeError) as exc:
+                    problems.append(f"cases.json: invalid case file ({exc})")
+                else:
+                    case_problems = [problem for i, record in enumerate(records)
+                                     for problem in validate_case(i, record, stats.keys())]
+                    problems.extend(f"cases.json: {problem}" for problem in case_problems)
+                    if not case_problems:
+                        cases = CaseIndex(records)
+
+            if problems:
+                error = ContentError("Invalid content:\n  " + "\n  ".join(sorted(problems)))
+                if self.version is None:
+                    raise error
+                # Keep serving the last good version until the files are fixed
+                if str(error) != self._last_error:
+                    logger.error("%s", error)
+                    self._last_error = str(error)
+                return False
+            self._last_error = None
+            for topic_key in changed:
+                self._cache.pop(topic_key, None)
+            cases_changed = cases_stat != self._cases_stat
+            if cases is not None:
+                self._cases = cases
+                self._cases_stat = cases_stat
+                self.cases_version = json_hash(cases_stat)
+            if cases_changed:
+                # Every cached topic may carry cases from the old index
+                self._cache.clear()
+
+            if changed or cases_changed or self.version is None:
+                self._manifest = OrderedDict(
+                    sorted(manifest.items(), key=lambda item: (item[1]["order"], item[0]))
+                )
+                self.version = json_hash([(key, entry["mtime_ns"], entry["size"])
+                                          for key, entry in self._manifest.items()] + [cases_stat])
+                self._corpus = CorpusManifest(self.version, self._manifest, self._cases.by_topic)
+                if changed:
+                    self._save_manifest()
+                if self.use_snapshot:
+                    self._open_snapshot(changed)
+            return bool(changed or cases_changed)
+
+    def _open_snapshot(self, changed):
+        """Map the snapshot for the current version, writing it first if no process has"""
+        path = os.path.join(self.snapshot_dir, f"topics-{self.version[:16]}.snap")
+        try:
+            if not os.path.exists(path):
+                os.makedirs(self.snapshot_dir, exist_ok=True)
+                Snapshot.write(path, self._snapshot_records(changed))
+                self._remove_stale_snapshots(path)
+            snapshot = Snapshot(path)
+        except OSError:
+            # Read-only or full disk: keep serving straight from the topic files
+            snapshot = None
+        if self._snapshot is not None:
+            self._snapshot.close()
+        self._snapshot = snapshot
+
+    def _snapshot_records(self, changed):
+        """Record bytes for every topic, reusing the previous snapshot for unchanged ones"""
+        for topic_key in self._manifest:
+            record = None
+            if self._snapshot is not None and topic_key not in changed:
+                record = self._snapshot.raw(topic_key)
+            if record is None:
+                record = encode_record(self._read_topic(topic_key))
+            yield topic_key, record
+
+    def _remove_stale_snapshots(self, current):
+        # Processes still mapping an old file keep their pages until they remap
+        for entry in os.scandir(self.snapshot_dir):
+            if entry.path != current and entry.name.endswith(".snap"):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+    def manifest(self):
+        """Ordered mapping of topic key -> title, counts and diagram hash"""
+        self.refresh()
+        return self._manifest
+
+    def corpus(self):
+        """Columnar summary and totals for the current content version"""
+        self.refresh()
+        return self._corpus
+
+    def cases(self):
+        """Case law index for the current content version"""
+        self.refresh()
+        return self._cases
+
+    def __contains__(self, topic_key):
+        return topic_key in self.manifest()
+
+    def get(self, topic_key):
+        """Frozen topic body, decoded on first use and kept in a bounded LRU cache"""
+        entry = self.manifest()[topic_key]
+        with self._lock:
+            cached = self._cache.get(topic_key)
+            if cached and cached[0] == entry["mtime_ns"]:
+                self._cache.move_to_end(topic_key)
+                return cached[1]
+            if self._snapshot is not None:
+                topic = self._snapshot.get(topic_key)
+            else:
+                topic = Topic.from_dict(topic_key, self._read_topic(topic_key))
+            indexed = self._cases.topic_markdown(topic_key)
+            if indexed:
+                topic = replace(topic, cases="\n".join(filter(None, (topic.cases, indexed))))
+            self._cache[topic_key] = (entry["mtime_ns"], topic)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return topic
+
+    def items(self):
+        """Iterate (topic key, topic) over the whole corpus in display order"""
+        for topic_key in list(self.manifest()):
+            yield topic_key, self.get(topic_key)
@@ -0,0 +1,151 @@
+"""Incremental, parallel diagram export packaged as a zip
+
+Each topic's figure is rendered to four artifacts - the Plotly JSON spec,
+an interactive HTML fragment, and static SVG and PNG images drawn with
+matplotlib. Artifacts are cached on disk under a key derived from the
+topic's diagram content, so an export only renders topics that changed
+since the last one. Missing artifacts are rendered in a process pool and
+the results are copied into a zip file on disk, one member at a time.
+"""
+
+import hashlib
+import html
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from content_model import thaw
+from diagrams import build_diagram
+from static_charts import render_static
+
+# Bump when the artifacts' content or layout changes, so stale caches are ignored
+ARTIFACT_FORMAT = 4
+ARTIFACT_FILES = ("figure.json", "figure.html", "figure.svg", "figure.png")
+
+# Worker processes for rendering; below POOL_THRESHOLD missing topics, render inline
+EXPORT_WORKERS = int(os.environ.get("LAND_LAW_EXPORT_WORKERS", 0)) or os.cpu_count() or 1
+POOL_THRESHOLD = 4
+
+# Prefix of the directories renders write into before renaming them into place
+STAGING_PREFIX = ".tmp-"
+
+# Images are already compressed, so storing them saves CPU for nothing lost
+STORED_SUFFIXES = (".png",)
+
+
+def artifact_key(topic_key, title, diagram_hash):
+    """Cache key of one topic's artifacts"""
+    import plotly
+    payload = json.dumps([ARTIFACT_FORMAT, plotly.__version__, topic_key, title, diagram_hash])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def render_artifacts(job):
+    """Render one topic's artifacts into its cache directory (runs in a worker)"""
+    topic_key, title, diagram_data, target = job
+    fig = build_diagram(topic_key, diagram_data)
+    staging = tempfile.mkdtemp(dir=os.path.dirname(target), prefix=STAGING_PREFIX)
+    try:
+        div_id = f"diagram-{topic_key}"
+        fragment = fig.to_html(full_html=False, include_plotlyjs=False, div_id=div_id)
+        files = {
+            "figure.json": fig.to_json().encode("utf-8"),
+            "figure.html": f"<h2>{html.escape(title)}</h2>{fragment}".encode("utf-8"),
+            "figure.svg": render_static(fig, "svg"),
+            "figure.png": render_static(fig, "png")
+        }
+        for name, payload in files.items():
+            with open(os.path.join(staging, name), "wb") as f:
+                f.write(payload)
+        try:
+            os.rename(staging, target)
+        except OSError:
+            # Another export rendered the same topic first; its copy is identical
+            if not os.path.isdir(target):
+                raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return topic_key
+
+
+class DiagramExporter:
+    """Renders and caches per-topic diagram artifacts and zips them up"""
+
+    def __init__(self, cache_dir, workers=EXPORT_WORKERS):
+        self.cache_dir = cache_dir
+        self.workers = workers
+
+    def _target(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def ensure(self, content_store, topic_keys):
+        """Render any missing artifacts and return topic key -> artifact directory"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        manifest = content_store.manifest()
+        targets = {}
+        jobs = []
+        for topic_key in topic_keys:
+            entry = manifest[topic_key]
+            if not entry["has_diagram"]:
+                continue
+            target = self._target(artifact_key(topic_key, entry["title"], entry["diagram_hash"]))
+            targets[topic_key] = target
+            if not os.path.isdir(target):
+                diagram_data = thaw(content_store.get(topic_key).diagram_data)
+                jobs.append((topic_key, entry["title"], diagram_data, target))
+
+        if len(jobs) < POOL_THRESHOLD or self.workers < 2:
+            for job in jobs:
+                render_artifacts(job)
+        else:
+            # Spawned, not forked: the server process is multi-threaded
+            workers = min(self.workers, len(jobs))
+            with ProcessPoolExecutor(workers, mp_context=get_context("spawn")) as pool:
+                chunksize = max(1, len(jobs) // (workers * 4))
+                for _ in pool.map(render_artifacts, jobs, chunksize=chunksize):
+                    pass
+        return targets
+
+    def prune(self, keep):
+        """Remove cached artifacts for topic versions no longer in the corpus
+
+        Staging directories are left alone: they belong to renders still running.
+        """
+        keep = {os.path.basename(target) for target in keep}
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_dir() and entry.name not in keep and not entry.name.startswith(STAGING_PREFIX):
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    def write_zip(self, targets, plotlyjs_path):
+        """Zip the artifacts returned by ensure() into a temporary file and return it rewound
+
+        The file is open for reading and writing, which st.download_button does
+        not accept from a deferred callable; callers hand over its bytes instead.
+        """
+        export_file = tempfile.TemporaryFile()
+        with zipfile.ZipFile(export_file, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.write(plotlyjs_path, "plotly.min.js")
+            with archive.open("index.html", "w") as index:
+                index.write(b'<html><head><meta charset="utf-8"><title>Land Law Diagrams</title>'
+                            b'<script src="plotly.min.js"></script></head><body>'
+                            b"<h1>Land Law - All Diagrams</h1>")
+                for target in targets.values():
+                    with open(os.path.join(target, "figure.html"), "rb") as fragment:
+                        shutil.copyfileobj(fragment, index)
+                    index.write(b"<hr>")
+                index.write(b"</body></html>")
+            # One folder per artifact type: json/, html/, svg/ and png/
+            for topic_key, target in targets.items():
+                for name in ARTIFACT_FILES:
+                    suffix = os.path.splitext(name)[1]
+                    archive.write(
+                        os.path.join(target, name),
+                        f"{suffix[1:]}/{topic_key}{suffix}",
+                        compress_type=zipfile.ZIP_STORED if suffix in STORED_SUFFIXES else None
+                    )
+        export_file.seek(0)
+        return export_file
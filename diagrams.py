@@ -0,0 +1,243 @@
+"""Plotly figures for each topic, built from the topic's diagram data
+
+A topic's diagram_data names its chart declaratively, next to the series
+it plots, e.g.
+
+    "chart": {"kind": "bar", "x": "types", "y": "frequency", "color": "types",
+              "title": "Types of Easements", "palette": "Pastel"}
+
+CHART_KINDS maps each kind to a Plotly Express function and lists the
+series arguments it needs and the options it accepts, so a new topic needs
+no code change. validate_chart() checks a spec, its option values and any
+trendline against the registry when content is loaded.
+
+Kept out of the app script so export worker processes can build the same
+figures without importing Streamlit.
+"""
+
+import math
+from collections import Counter, namedtuple
+
+# required/optional: px arguments that name a diagram_data series; options: px arguments given as-is
+ChartKind = namedtuple("ChartKind", "function required optional options")
+
+CHART_KINDS = {
+    "pie": ChartKind("pie", ("names", "values"), (), ("hole",)),
+    "bar": ChartKind("bar", ("x", "y"), ("color",), ()),
+    "line": ChartKind("line", ("x", "y"), ("color",), ("markers", "line_shape", "line_width")),
+    "area": ChartKind("area", ("x", "y"), ("color",), ("line_shape",)),
+    "scatter": ChartKind("scatter", ("x", "y"), ("color", "size"), ()),
+    "bar_polar": ChartKind("bar_polar", ("r", "theta"), ("color",), ()),
+}
+
+# Options every kind accepts
+COMMON_OPTIONS = ("kind", "title", "labels", "palette", "template", "height")
+
+# Options applied to the built figure rather than passed to Plotly Express
+STYLE_OPTIONS = ("line_width", "height")
+
+# Named Plotly qualitative colour sequences (plotly.express.colors.qualitative)
+PALETTES = ("Plotly", "D3", "G10", "T10", "Alphabet", "Dark24", "Light24", "Set1", "Pastel1",
+            "Dark2", "Set2", "Pastel2", "Set3", "Antique", "Bold", "Pastel", "Prism", "Safe", "Vivid")
+
+TEMPLATES = ("plotly", "plotly_white", "plotly_dark", "ggplot2", "seaborn", "simple_white", "none")
+
+LINE_SHAPES = ("linear", "spline", "hv", "vh", "hvh", "vhv")
+
+# Check and description of the value each option takes
+OPTION_TYPES = {
+    "title": (lambda value: isinstance(value, str), "a string"),
+    "height": (lambda value: _is_number(value, integer=True) and value > 0, "a positive integer"),
+    "hole": (lambda value: _is_number(value) and 0 <= value < 1, "a number from 0 up to 1"),
+    "markers": (lambda value: isinstance(value, bool), "true or false"),
+    "line_shape": (lambda value: value in LINE_SHAPES, f"one of {', '.join(LINE_SHAPES)}"),
+    "line_width": (lambda value: _is_number(value) and value > 0, "a positive number"),
+}
+
+# Trendline kinds (see trendlines.py) and the extra parameter each one takes
+TRENDLINE_KINDS = {"linear": (), "poly": ("degree",), "rolling": ("window",)}
+TRENDLINE_OPTIONS = ("x", "y", "kind", "bands", "confidence")
+# Confidence levels trendlines.Z_SCORES has quantiles for
+CONFIDENCE_LEVELS = (0.8, 0.9, 0.95, 0.99)
+
+# Overview dashboard layout
+OVERVIEW_COLUMNS = 3
+OVERVIEW_ROW_HEIGHT = 320
+
+# Case timelines plot one point per case up to this many cases, then counts per decade
+TIMELINE_MAX_POINTS = 500
+TIMELINE_ROW_HEIGHT = 28
+
+# Subplot cell type for each trace type that is not drawn on x/y axes
+CELL_TYPES = {"pie": "domain", "barpolar": "polar", "scatterpolar": "polar"}
+
+
+def _is_number(value, integer=False):
+    """True for JSON numbers (not booleans), optionally only whole ones"""
+    if isinstance(value, bool):
+        return False
+    return isinstance(value, int) or (not integer and isinstance(value, float) and math.isfinite(value))
+
+
+def _is_series(data, name):
+    return isinstance(name, str) and isinstance(data.get(name), list)
+
+
+def validate_chart(data):
+    """Return a list of problems with the chart and trendline specs in one topic's diagram_data"""
+    if not data:
+        return []
+    chart = data.get("chart")
+    if not isinstance(chart, dict):
+        return ["'diagram_data' needs a 'chart' object naming its kind and series"]
+    kind = CHART_KINDS.get(chart.get("kind")) if isinstance(chart.get("kind"), str) else None
+    if kind is None:
+        return [f"unknown chart kind {chart.get('kind')!r} (expected one of {', '.join(CHART_KINDS)})"]
+    problems = []
+    allowed = set(COMMON_OPTIONS + kind.required + kind.optional + kind.options)
+    problems += [f"chart: unknown option '{key}'" for key in chart if key not in allowed]
+    for argument in kind.required + kind.optional:
+        series = chart.get(argument)
+        if series is None:
+            if argument in kind.required:
+                problems.append(f"chart: missing series for '{argument}'")
+        elif not _is_series(data, series):
+            problems.append(f"chart: '{argument}' names {series!r}, which is not a series in diagram_data")
+    for option, (check, expected) in OPTION_TYPES.items():
+        if option in chart and option in allowed and not check(chart[option]):
+            problems.append(f"chart: '{option}' must be {expected}, not {chart[option]!r}")
+    if "palette" in chart and chart["palette"] not in PALETTES:
+        problems.append(f"chart: unknown palette {chart['palette']!r}")
+    if "template" in chart and chart["template"] not in TEMPLATES:
+        problems.append(f"chart: unknown template {chart['template']!r}")
+    if "labels" in chart and not (isinstance(chart["labels"], dict)
+                                  and all(isinstance(label, str) for label in chart["labels"].values())):
+        problems.append("chart: 'labels' must be an object of strings")
+    if "trendline" in data:
+        problems += validate_trendline(data, data["trendline"])
+    return problems
+
+
+def validate_trendline(data, spec):
+    """Return a list of problems with a trendline spec against the series in diagram_data"""
+    if not isinstance(spec, dict):
+        return ["'trendline' must be an object naming its x and y series"]
+    kind = spec.get("kind", "linear")
+    if not isinstance(kind, str) or kind not in TRENDLINE_KINDS:
+        return [f"trendline: unknown kind {kind!r} (expected one of {', '.join(TRENDLINE_KINDS)})"]
+    problems = []
+    allowed = TRENDLINE_OPTIONS + TRENDLINE_KINDS[kind]
+    problems += [f"trendline: unknown option '{key}'" for key in spec if key not in allowed]
+    lengths = []
+    for axis in ("x", "y"):
+        series = spec.get(axis)
+        if series is None:
+            problems.append(f"trendline: missing series for '{axis}'")
+        elif not _is_series(data, series):
+            problems.append(f"trendline: '{axis}' names {series!r}, which is not a series in diagram_data")
+        elif not all(_is_number(value) for value in data[series]):
+            problems.append(f"trendline: series {series!r} must hold numbers")
+        else:
+            lengths.append(len(data[series]))
+    if len(lengths) == 2 and lengths[0] != lengths[1]:
+        problems.append(f"trendline: x and y series differ in length ({lengths[0]} and {lengths[1]})")
+    points = min(lengths) if lengths else None
+    if "degree" in spec and kind == "poly":
+        degree = spec["degree"]
+        if not _is_number(degree, integer=True) or degree < 1:
+            problems.append(f"trendline: 'degree' must be a positive integer, not {degree!r}")
+        elif points is not None and degree >= points:
+            problems.append(f"trendline: degree {degree} needs more than {degree} points")
+    if "window" in spec and kind == "rolling":
+        window = spec["window"]
+        if not _is_number(window, integer=True) or window < 1:
+            problems.append(f"trendline: 'window' must be a positive integer, not {window!r}")
+        elif points is not None and window > points:
+            problems.append(f"trendline: window {window} is longer than the series ({points} points)")
+    if "confidence" in spec and spec["confidence"] not in CONFIDENCE_LEVELS:
+        problems.append(f"trendline: 'confidence' must be one of {', '.join(map(str, CONFIDENCE_LEVELS))}, "
+                        f"not {spec['confidence']!r}")
+    if "bands" in spec and not isinstance(spec["bands"], bool):
+        problems.append(f"trendline: 'bands' must be true or false, not {spec['bands']!r}")
+    return problems
+
+
+def build_diagram(topic_key, data):
+    """Build a fresh Plotly figure from a topic's diagram data (None when it has no chart)"""
+    if not data or "chart" not in data:
+        return None
+    fig = _chart(data)
+
+    # Any topic can ask for a trendline declaratively in its diagram data
+    if "trendline" in data:
+        from trendlines import trendline_traces
+        fig.add_traces(trendline_traces(data, data["trendline"]))
+    return fig
+
+
+def _chart(data):
+    """The base chart described by a validated chart spec"""
+    # Imported here so plotly (and pandas under it) load on the first chart, not at startup
+    import plotly.express as px
+
+    chart = data["chart"]
+    kind = CHART_KINDS[chart["kind"]]
+    arguments = {argument: list(data[chart[argument]])
+                 for argument in kind.required + kind.optional if argument in chart}
+    arguments.update((option, chart[option]) for option in kind.options
+                     if option in chart and option not in STYLE_OPTIONS)
+    for option in ("title", "template"):
+        if option in chart:
+            arguments[option] = chart[option]
+    if "labels" in chart:
+        arguments["labels"] = dict(chart["labels"])
+    if "palette" in chart:
+        arguments["color_discrete_sequence"] = getattr(px.colors.qualitative, chart["palette"])
+
+    fig = getattr(px, kind.function)(**arguments)
+    if "line_width" in chart:
+        fig.update_traces(line=dict(width=chart["line_width"]))
+    if "height" in chart:
+        fig.update_layout(height=chart["height"])
+    return fig
+
+
+def build_overview(figures, titles, columns=OVERVIEW_COLUMNS):
+    """Combine several topic figures into one subplot grid, sent as a single chart"""
+    from plotly.subplots import make_subplots
+
+    rows = max(1, math.ceil(len(figures) / columns))
+    specs = [[None] * columns for _ in range(rows)]
+    for i, fig in enumerate(figures):
+        trace_type = fig.data[0].type if fig.data else "scatter"
+        specs[i // columns][i % columns] = {"type": CELL_TYPES.get(trace_type, "xy")}
+    overview = make_subplots(rows=rows, cols=columns, specs=specs, subplot_titles=list(titles),
+                             vertical_spacing=0.3 / rows, horizontal_spacing=0.06)
+    for i, fig in enumerate(figures):
+        overview.add_traces(list(fig.data), rows=i // columns + 1, cols=i % columns + 1)
+    overview.update_traces(showlegend=False)
+    overview.update_layout(height=rows * OVERVIEW_ROW_HEIGHT, margin=dict(t=60, b=20))
+    return overview
+
+
+def build_case_timeline(cases, topic_titles, max_points=TIMELINE_MAX_POINTS):
+    """Year-by-topic scatter of case_law.Case records, or cases per decade when there are many"""
+    import plotly.graph_objects as go
+
+    if len(cases) <= max_points:
+        # A case tagged with several topics appears on each topic's row
+        points = [(case, topic_titles.get(topic, topic)) for case in cases for topic in case.topics]
+        rows = len({label for _, label in points})
+        fig = go.Figure(go.Scatter(
+            x=[case.year for case, _ in points], y=[label for _, label in points], mode="markers",
+            text=[f"{case.name}<br>{case.holding}" for case, _ in points], marker=dict(size=10),
+            hovertemplate="%{text}<br>%{x}<extra></extra>"))
+        fig.update_layout(title="Cases by Year", xaxis_title="Year", yaxis_title=None,
+                          height=max(240, 120 + rows * TIMELINE_ROW_HEIGHT))
+    else:
+        decades = sorted(Counter(case.year // 10 * 10 for case in cases).items())
+        fig = go.Figure(go.Bar(x=[decade for decade, _ in decades], y=[count for _, count in decades],
+                               hovertemplate="%{x}s: %{y} cases<extra></extra>"))
+        fig.update_layout(title="Cases per Decade", xaxis_title="Decade", yaxis_title="Cases", height=320)
+    fig.update_layout(template="plotly_white", margin=dict(t=50, b=40))
+    return fig
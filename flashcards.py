@@ -0,0 +1,352 @@
+"""Spaced-repetition flashcards generated from the topic content
+
+Cards come from each topic's definition, key points and case examples and
+are scheduled per learner with the SM-2 algorithm. Each learner's due
+cards sit in a heap, so picking the next card costs O(log n), and cards
+never reviewed are served from a cursor over the deck instead of being
+queued up front. Review results are written to SQLite in batches by a
+background thread rather than once per click.
+"""
+
+import atexit
+import hashlib
+import heapq
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+DB_PATH = os.environ.get("LAND_LAW_FLASHCARD_DB",
+                         os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "flashcards.db"))
+
+# Pending reviews are written when this many are queued or this many seconds pass
+FLUSH_BATCH = 256
+FLUSH_INTERVAL = 2.0
+
+# Learners whose schedules are kept in memory
+LEARNER_CACHE_SIZE = 1024
+
+# SM-2 parameters
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+DAY = 86400
+# A forgotten card comes back in the same sitting rather than tomorrow
+RELEARN_DELAY = 600
+
+# Answer buttons and the SM-2 quality each one records
+GRADES = {"Again": 1, "Hard": 3, "Good": 4, "Easy": 5}
+
+CASE_RE = re.compile(r"\*(?P<case>[^*]+)\*\s*\((?P<year>\d{4})\):\s*(?P<holding>.+)")
+CLOZE_MIN_LENGTH = 5
+
+Card = namedtuple("Card", "card_id topic_key kind front back")
+Review = namedtuple("Review", "repetitions interval ease due")
+
+
+def card_id(topic_key, kind, text):
+    """Stable id for a card; editing the text it was made from starts a new card"""
+    digest = hashlib.sha1(f"{kind}\0{text}".encode("utf-8")).hexdigest()[:12]
+    return f"{topic_key}:{digest}"
+
+
+def cloze(text):
+    """Blank out the longest word of a key point"""
+    words = re.findall(r"[A-Za-z][A-Za-z'-]+", text)
+    if not words:
+        return None
+    longest = max(words, key=len)
+    if len(longest) < CLOZE_MIN_LENGTH:
+        return None
+    return text.replace(longest, "_" * 5, 1)
+
+
+def topic_cards(topic_key, topic):
+    """Yield the flashcards for one topic"""
+    yield Card(card_id(topic_key, "definition", topic.definition), topic_key, "definition",
+               f"What is meant by **{topic.title}**?", topic.definition)
+    for point in topic.key_points:
+        front = cloze(point)
+        if front:
+            yield Card(card_id(topic_key, "key_point", point), topic_key, "key_point",
+                       f"**{topic.title}**: complete the key point\n\n{front}", point)
+    for line in topic.cases.splitlines():
+        match = CASE_RE.search(line)
+        if match:
+            yield Card(card_id(topic_key, "case", line), topic_key, "case",
+                       f"What did *{match['case']}* ({match['year']}) decide?", match["holding"].strip())
+
+
+class Deck:
+    """Every card of one content version, in topic display order"""
+
+    def __init__(self, topics):
+        self.cards = OrderedDict()
+        self.by_topic = {}
+        self._by_kind = {}
+        for topic_key, topic in topics:
+            for card in topic_cards(topic_key, topic):
+                self.cards[card.card_id] = card
+                self.by_topic.setdefault(topic_key, []).append(card.card_id)
+                self._by_kind.setdefault(card.kind, []).append(card.card_id)
+
+    def __len__(self):
+        return len(self.cards)
+
+    def scope(self, topic_keys=None):
+        """Card ids for the given topics (all when empty), in deck order"""
+        if not topic_keys:
+            return list(self.cards)
+        return [card_id for topic_key in topic_keys for card_id in self.by_topic.get(topic_key, ())]
+
+    def choices(self, card, count=4):
+        """Multiple-choice answers for a card: its own back and others of the same kind"""
+        pool = self._by_kind[card.kind]
+        rng = random.Random(card.card_id)
+        answers = {card.back}
+        # Sampling a few random positions keeps this O(count) however big the deck is
+        for _ in range(count * 4):
+            if len(answers) >= count or len(pool) <= 1:
+                break
+            other = self.cards[pool[rng.randrange(len(pool))]]
+            if other.topic_key != card.topic_key:
+                answers.add(other.back)
+        answers = sorted(answers)
+        rng.shuffle(answers)
+        return answers
+
+
+def sm2(review, quality, now):
+    """Next review state after answering with an SM-2 quality from 0 to 5"""
+    if review is None:
+        review = Review(0, 0.0, INITIAL_EASE, now)
+    ease = max(MIN_EASE, review.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    if quality < 3:
+        return Review(0, 0.0, ease, now + RELEARN_DELAY)
+    repetitions = review.repetitions + 1
+    if repetitions == 1:
+        interval = 1.0
+    elif repetitions == 2:
+        interval = 6.0
+    else:
+        interval = review.interval * ease
+    return Review(repetitions, interval, ease, now + interval * DAY)
+
+
+class Schedule:
+    """One learner's review states and due-queue over a scope of the deck"""
+
+    def __init__(self, reviews):
+        # card id -> Review, for every card the learner has answered
+        self.reviews = reviews
+        self.scope_key = None
+        self._heap = []
+        self._new = []
+        self._new_cursor = 0
+        self._new_remaining = 0
+
+    def set_scope(self, deck, topic_keys):
+        """Rebuild the queues, but only when the studied topics or the deck change"""
+        scope_key = (id(deck), tuple(topic_keys))
+        if scope_key == self.scope_key:
+            return
+        self.scope_key = scope_key
+        card_ids = deck.scope(topic_keys)
+        self._heap = [(self.reviews[card_id].due, card_id) for card_id in card_ids if card_id in self.reviews]
+        heapq.heapify(self._heap)
+        self._new = card_ids
+        self._new_cursor = 0
+        self._new_remaining = len(card_ids) - len(self._heap)
+
+    def _skip_stale(self):
+        # Rescheduling pushes a fresh entry, so older ones for the same card are dropped here
+        while self._heap and self.reviews[self._heap[0][1]].due != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def _skip_seen(self):
+        while self._new_cursor < len(self._new) and self._new[self._new_cursor] in self.reviews:
+            self._new_cursor += 1
+
+    def next_card(self, now):
+        """Id of the card to show now: the most overdue review, else the next new card"""
+        self._skip_stale()
+        if self._heap and self._heap[0][0] <= now:
+            return self._heap[0][1]
+        self._skip_seen()
+        if self._new_cursor < len(self._new):
+            return self._new[self._new_cursor]
+        return None
+
+    def answer(self, card_id, quality, now):
+        previous = self.reviews.get(card_id)
+        review = sm2(previous, quality, now)
+        self.reviews[card_id] = review
+        heapq.heappush(self._heap, (review.due, card_id))
+        if previous is None:
+            self._new_remaining -= 1
+        return review
+
+    def counts(self, now):
+        """Cards due now and cards not yet seen, in the current scope
+
+        Only the part of the heap that is due is walked, so this costs
+        O(due cards) rather than O(deck).
+        """
+        due = 0
+        stack = [0] if self._heap else []
+        while stack:
+            i = stack.pop()
+            entry_due, card_id = self._heap[i]
+            if entry_due > now:
+                continue
+            if self.reviews[card_id].due == entry_due:
+                due += 1
+            stack.extend(child for child in (2 * i + 1, 2 * i + 2) if child < len(self._heap))
+        return due, self._new_remaining
+
+
+class ReviewStore:
+    """SQLite persistence for review states with write-behind batching"""
+
+    def __init__(self, path=DB_PATH, flush_batch=FLUSH_BATCH, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.flush_batch = flush_batch
+        self.flush_interval = flush_interval
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS reviews ("
+                " learner TEXT NOT NULL, card_id TEXT NOT NULL, repetitions INTEGER NOT NULL,"
+                " interval REAL NOT NULL, ease REAL NOT NULL, due REAL NOT NULL, reviewed_at REAL NOT NULL,"
+                " PRIMARY KEY (learner, card_id)) WITHOUT ROWID"
+            )
+        self._pending = {}
+        self._lock = threading.Lock()
+        # Held while a batch is written, so load() never sees a batch that is in neither place
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._writer = threading.Thread(target=self._write_loop, name="flashcard-writer", daemon=True)
+        self._writer.start()
+        # The writer is a daemon thread, so whatever is still queued at exit is written here
+        atexit.register(self.flush)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def load(self, learner):
+        """Every review state of one learner (a primary-key range read)"""
+        with self._write_lock:
+            with self._connect() as db:
+                rows = db.execute(
+                    "SELECT card_id, repetitions, interval, ease, due FROM reviews WHERE learner = ?", (learner,)
+                ).fetchall()
+            reviews = {card_id: Review(*state) for card_id, *state in rows}
+            with self._lock:
+                # Answers still waiting to be written are newer than the table
+                for (pending_learner, card_id), (review, _) in self._pending.items():
+                    if pending_learner == learner:
+                        reviews[card_id] = review
+        return reviews
+
+    def save(self, learner, card_id, review, now):
+        """Queue a review state; repeated answers to one card collapse into one write"""
+        with self._lock:
+            self._pending[(learner, card_id)] = (review, now)
+            full = len(self._pending) >= self.flush_batch
+        if full:
+            self._wake.set()
+
+    def flush(self):
+        """Write every queued review in one transaction
+
+        Answers saved meanwhile queue up as usual; only load() waits for the
+        commit. A failed write puts its rows back in the queue.
+        """
+        with self._write_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            rows = [(learner, card_id, *review, reviewed_at)
+                    for (learner, card_id), (review, reviewed_at) in pending.items()]
+            try:
+                with self._connect() as db:
+                    db.executemany(
+                        "INSERT INTO reviews (learner, card_id, repetitions, interval, ease, due, reviewed_at)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (learner, card_id) DO UPDATE SET"
+                        " repetitions = excluded.repetitions, interval = excluded.interval, ease = excluded.ease,"
+                        " due = excluded.due, reviewed_at = excluded.reviewed_at",
+                        rows
+                    )
+            except sqlite3.Error:
+                with self._lock:
+                    # Answers saved since the swap are newer than the failed batch
+                    for key, value in pending.items():
+                        self._pending.setdefault(key, value)
+                raise
+        return len(rows)
+
+    def _write_loop(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except sqlite3.Error:
+                # Keep the loop alive; the batch is back in the queue for the next attempt
+                pass
+
+
+class FlashcardService:
+    """Process-wide deck, learner schedules and review store"""
+
+    def __init__(self, store, learner_cache_size=LEARNER_CACHE_SIZE):
+        self.store = store
+        self.learner_cache_size = learner_cache_size
+        self._schedules = OrderedDict()
+        self._lock = threading.Lock()
+
+    def schedule(self, learner):
+        """A learner's schedule, loaded from the store on first use"""
+        with self._lock:
+            schedule = self._schedules.get(learner)
+            if schedule is not None:
+                self._schedules.move_to_end(learner)
+                return schedule
+        schedule = Schedule(self.store.load(learner))
+        with self._lock:
+            schedule = self._schedules.setdefault(learner, schedule)
+            while len(self._schedules) > self.learner_cache_size:
+                self._schedules.popitem(last=False)
+        return schedule
+
+    def next_card(self, learner, deck, topic_keys=(), now=None):
+        """The card a learner should study next within the given topics, or None"""
+        now = time.time() if now is None else now
+        schedule = self.schedule(learner)
+        with self._lock:
+            schedule.set_scope(deck, topic_keys)
+            card_id = schedule.next_card(now)
+        return deck.cards[card_id] if card_id else None
+
+    def counts(self, learner, deck, topic_keys=(), now=None):
+        """(due now, never seen) card counts for a learner within the given topics"""
+        now = time.time() if now is None else now
+        schedule = self.schedule(learner)
+        with self._lock:
+            schedule.set_scope(deck, topic_keys)
+            return schedule.counts(now)
+
+    def answer(self, learner, card_id, quality, now=None):
+        """Record an answer, reschedule the card and queue the write"""
+        now = time.time() if now is None else now
+        schedule = self.schedule(learner)
+        with self._lock:
+            review = schedule.answer(card_id, quality, now)
+        self.store.save(learner, card_id, review, now)
+        return review
@@ -0,0 +1,162 @@
+"""In-process import-time profiler and cold-start budget check
+
+Usage:
+    python import_profiler.py                  # report for land_law_app.py
+    python import_profiler.py --budget-ms 2500 # exit 1 if cold start is over budget
+
+The check runs the app once in a fresh interpreter (Streamlit bare mode), so
+every measurement is a true cold start. The budget can also be set with the
+LAND_LAW_COLD_START_BUDGET_MS environment variable.
+"""
+
+import argparse
+import json
+import os
+import runpy
+import subprocess
+import sys
+import time
+
+DEFAULT_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "land_law_app.py")
+DEFAULT_BUDGET_MS = float(os.environ.get("LAND_LAW_COLD_START_BUDGET_MS", 4000))
+
+
+class _TimedLoader:
+    """Wraps a module loader and reports how long executing the module takes"""
+
+    def __init__(self, loader, profiler, name):
+        self._loader = loader
+        self._profiler = profiler
+        self._name = name
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler._enter(self._name)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit()
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+
+class _TimingFinder:
+    """Meta path finder that defers to the real finders and times their loaders"""
+
+    def __init__(self, profiler):
+        self._profiler = profiler
+
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader, self._profiler, fullname)
+            return spec
+        return None
+
+
+class ImportProfiler:
+    """Records self and cumulative import time per module, like ``-X importtime``"""
+
+    def __init__(self):
+        # (module name, self seconds, cumulative seconds, nesting depth), in completion order
+        self.records = []
+        self._stack = []
+        self._finder = _TimingFinder(self)
+
+    def __enter__(self):
+        sys.meta_path.insert(0, self._finder)
+        return self
+
+    def __exit__(self, *exc_info):
+        sys.meta_path.remove(self._finder)
+        return False
+
+    def _enter(self, name):
+        # [name, start time, time spent in nested imports]
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def _exit(self):
+        name, start, children = self._stack.pop()
+        cumulative = time.perf_counter() - start
+        if self._stack:
+            self._stack[-1][2] += cumulative
+        self.records.append((name, cumulative - children, cumulative, len(self._stack)))
+
+    def top(self, limit=25):
+        """The slowest imports by cumulative time"""
+        return sorted(self.records, key=lambda record: record[2], reverse=True)[:limit]
+
+    def report(self, limit=None):
+        """Format the records the way ``python -X importtime`` prints them"""
+        records = self.records if limit is None else self.top(limit)
+        lines = ["import time: self [us] | cumulative | imported package"]
+        for name, self_time, cumulative, depth in records:
+            # Nesting only reads correctly in completion order, not in a ranking
+            indent = "  " * depth if limit is None else ""
+            lines.append(f"import time: {self_time * 1e6:9.0f} | {cumulative * 1e6:10.0f} | {indent}{name}")
+        return "\n".join(lines)
+
+
+def _profile_script(script):
+    """Run the script once under the profiler and print the results as JSON"""
+    # Keep Streamlit's bare-mode warnings out of the JSON on stdout
+    os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(script)))
+    start = time.perf_counter()
+    with ImportProfiler() as profiler:
+        runpy.run_path(script, run_name="__main__")
+    elapsed = time.perf_counter() - start
+    json.dump({"elapsed_ms": elapsed * 1000, "records": profiler.records}, sys.stdout)
+
+
+def measure_cold_start(script=DEFAULT_SCRIPT):
+    """Profile one run of the script in a fresh interpreter
+
+    Returns (wall-clock ms including interpreter start-up, in-process ms, records).
+    """
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", script],
+        capture_output=True, text=True, check=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    data = json.loads(result.stdout)
+    return wall_ms, data["elapsed_ms"], data["records"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("script", nargs="?", default=DEFAULT_SCRIPT)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="fail if the cold start takes longer than this")
+    parser.add_argument("--top", type=int, default=25, help="number of slowest imports to list")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _profile_script(args.script)
+        return 0
+
+    wall_ms, run_ms, records = measure_cold_start(args.script)
+    profiler = ImportProfiler()
+    profiler.records = [tuple(record) for record in records]
+    print(profiler.report(limit=args.top))
+    print()
+    print(f"cold start: {wall_ms:.0f} ms wall, {run_ms:.0f} ms imports + first run "
+          f"(budget {args.budget_ms:.0f} ms)")
+    if wall_ms > args.budget_ms:
+        print("FAIL: cold start is over budget", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
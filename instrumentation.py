@@ -0,0 +1,219 @@
+"""Opt-in timing spans for the app's hot paths
+
+Enable with LAND_LAW_INSTRUMENT=1 for the whole process, or per session by
+opening the app with ?instrument=1. Span durations are kept in bucketed
+histograms per session and per process, and payload sizes in byte
+counters. Both are shown in a sidebar debug panel and periodically written
+to METRICS_DIR as JSONL snapshots and a Prometheus text-format file.
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+ENABLED = os.environ.get("LAND_LAW_INSTRUMENT", "") not in ("", "0", "false")
+METRICS_DIR = os.environ.get("LAND_LAW_METRICS_DIR",
+                             os.path.join(os.path.dirname(os.path.abspath(__file__)), "metrics"))
+DUMP_INTERVAL = float(os.environ.get("LAND_LAW_METRICS_INTERVAL", 30))
+
+# Histogram bucket upper bounds in seconds (Prometheus "le" labels)
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with interpolated quantiles"""
+
+    __slots__ = ("counts", "count", "total", "maximum")
+
+    def __init__(self):
+        # One slot per bucket plus an overflow slot for +Inf
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.maximum = max(self.maximum, seconds)
+
+    def quantile(self, q):
+        """Estimate the q-quantile in seconds by interpolating inside its bucket"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = BUCKETS[i - 1] if i else 0.0
+                # The largest sample bounds the top occupied bucket more tightly
+                upper = min(BUCKETS[i], self.maximum) if i < len(BUCKETS) else self.maximum
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.maximum
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.quantile(0.50) * 1000,
+            "p95_ms": self.quantile(0.95) * 1000,
+            "p99_ms": self.quantile(0.99) * 1000,
+            "max_ms": self.maximum * 1000
+        }
+
+
+class Recorder:
+    """Process-wide span histograms and the periodic metrics dump"""
+
+    def __init__(self, metrics_dir=METRICS_DIR, interval=DUMP_INTERVAL):
+        self.metrics_dir = metrics_dir
+        self.interval = interval
+        self.histograms = {}
+        # payload name -> [count, total bytes]
+        self.payloads = {}
+        self._lock = threading.Lock()
+        self._last_dump = time.monotonic()
+
+    def observe(self, name, seconds):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+            due = time.monotonic() - self._last_dump >= self.interval
+            if due:
+                self._last_dump = time.monotonic()
+        if due:
+            self.dump()
+
+    def observe_bytes(self, name, size):
+        with self._lock:
+            counter = self.payloads.setdefault(name, [0, 0])
+            counter[0] += 1
+            counter[1] += size
+
+    def snapshot(self):
+        with self._lock:
+            return {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+
+    def payload_snapshot(self):
+        with self._lock:
+            return {name: {"count": count, "bytes": total} for name, (count, total) in sorted(self.payloads.items())}
+
+    def prometheus_text(self):
+        """Histograms in the Prometheus text exposition format"""
+        lines = ["# HELP land_law_span_seconds Duration of instrumented app spans",
+                 "# TYPE land_law_span_seconds histogram"]
+        with self._lock:
+            for name, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(BUCKETS + ("+Inf",), histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f'land_law_span_seconds_bucket{{span="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'land_law_span_seconds_sum{{span="{name}"}} {histogram.total}')
+                lines.append(f'land_law_span_seconds_count{{span="{name}"}} {histogram.count}')
+            if self.payloads:
+                lines += ["# HELP land_law_payload_bytes_total Bytes of payloads sent to the browser",
+                          "# TYPE land_law_payload_bytes_total counter"]
+                lines += [f'land_law_payload_bytes_total{{payload="{name}"}} {total}'
+                          for name, (_, total) in sorted(self.payloads.items())]
+        return "\n".join(lines) + "\n"
+
+    def dump(self):
+        """Append a JSONL snapshot and rewrite the Prometheus file"""
+        os.makedirs(self.metrics_dir, exist_ok=True)
+        record = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "pid": os.getpid(), "spans": self.snapshot(),
+                  "payloads": self.payload_snapshot()}
+        with open(os.path.join(self.metrics_dir, "spans.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        prom_path = os.path.join(self.metrics_dir, "spans.prom")
+        tmp_path = f"{prom_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, prom_path)
+
+
+@st.cache_resource(show_spinner=False)
+def get_recorder():
+    """One recorder per process, shared by every session"""
+    return Recorder()
+
+
+def enabled():
+    """Whether spans are recorded for the current run"""
+    if ENABLED:
+        return True
+    if get_script_run_ctx() is None:
+        return False
+    return st.query_params.get("instrument") == "1"
+
+
+def _session_histograms():
+    if get_script_run_ctx() is None:
+        # Deferred downloads run outside any session
+        return None
+    return st.session_state.setdefault("_span_histograms", {})
+
+
+@contextmanager
+def _timed(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        get_recorder().observe(name, seconds)
+        histograms = _session_histograms()
+        if histograms is not None:
+            histograms.setdefault(name, Histogram()).observe(seconds)
+
+
+def record_bytes(name, size):
+    """Count a payload of `size` bytes under `name` when instrumentation is on"""
+    if not enabled():
+        return
+    get_recorder().observe_bytes(name, size)
+    if get_script_run_ctx() is not None:
+        counter = st.session_state.setdefault("_payload_bytes", {}).setdefault(name, [0, 0])
+        counter[0] += 1
+        counter[1] += size
+
+
+def span(name):
+    """Context manager timing a named span when instrumentation is on"""
+    if not enabled():
+        return nullcontext()
+    return _timed(name)
+
+
+def debug_panel():
+    """Hidden sidebar panel with this session's and this process's span percentiles"""
+    if not enabled():
+        return
+    with st.expander("🛠️ Debug: timings"):
+        histograms = _session_histograms() or {}
+        for label, summaries in (
+            ("This session", {name: h.summary() for name, h in sorted(histograms.items())}),
+            ("This process", get_recorder().snapshot())
+        ):
+            st.markdown(f"**{label}**")
+            if summaries:
+                st.table([{"span": name, "n": s["count"], "p50 ms": round(s["p50_ms"], 2),
+                           "p95 ms": round(s["p95_ms"], 2), "p99 ms": round(s["p99_ms"], 2)}
+                          for name, s in summaries.items()])
+            else:
+                st.caption("No spans recorded yet")
+        payloads = st.session_state.get("_payload_bytes", {})
+        if payloads:
+            st.markdown("**Payload bytes (this session)**")
+            st.table([{"payload": name, "n": count, "total KiB": round(total / 1024, 1),
+                       "mean bytes": round(total / count)} for name, (count, total) in sorted(payloads.items())])
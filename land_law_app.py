@@ -1,11 +1,18 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import matplotlib.pyplot as plt
-import numpy as np
-from io import BytesIO
-import base64
+import html
+import os
+import uuid
+from app_cache import (LITE_MODE, create_case_timeline_spec, create_chart_spec, create_overview_spec,
+                       create_static_diagram, create_topic_html, get_content_store, get_diagram_exporter,
+                       get_flashcard_deck, get_flashcard_service, get_search_index, overview_pages)
+from flashcards import GRADES
+from instrumentation import debug_panel, span
+from markdown_html import markdown_to_html
+from page_html import PAGE_STYLE
+from navigation import topic_navigator
+from notes_export import NOTE_FORMATS, write_notes
+from static_assets import asset_path, publish_image
+from warmup import start_warmup
 
 # Set page configuration
 st.set_page_config(
@@ -15,253 +22,88 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for better styling
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.5rem;
-        color: #2E86AB;
-        text-align: center;
-        padding: 1rem;
-        background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
-        border-radius: 10px;
-        margin-bottom: 2rem;
-    }
-    .sub-header {
-        font-size: 1.8rem;
-        color: #264653;
-        border-left: 5px solid #2A9D8F;
-        padding-left: 15px;
-        margin-top: 2rem;
-        margin-bottom: 1rem;
-    }
-    .topic-button {
-        width: 100%;
-        margin: 5px 0;
-        padding: 12px;
-        font-size: 1.1rem;
-        background-color: #2A9D8F;
-        color: white;
-        border: none;
-        border-radius: 8px;
-        transition: all 0.3s;
-    }
-    .topic-button:hover {
-        background-color: #21867A;
-        transform: translateY(-2px);
-    }
-    .definition-box {
-        background-color: #f8f9fa;
-        padding: 20px;
-        border-radius: 10px;
-        border-left: 5px solid #E76F51;
-        margin: 15px 0;
-    }
-    .important-note {
-        background-color: #FFF3CD;
-        padding: 15px;
-        border-radius: 8px;
-        border: 1px solid #FFEAA7;
-        margin: 15px 0;
-    }
-    .diagram-container {
-        background-color: white;
-        padding: 20px;
-        border-radius: 10px;
-        box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-        margin: 20px 0;
-    }
-</style>
-""", unsafe_allow_html=True)
+# Custom CSS for better styling, minified once per process; a rerun resends only a cache reference
+st.html(PAGE_STYLE)
 
 # Initialize session state
 if 'current_topic' not in st.session_state:
     st.session_state.current_topic = None
+if 'lite_mode' not in st.session_state:
+    st.session_state.lite_mode = LITE_MODE or st.query_params.get("lite") == "1"
 
-# Land Law Data
-land_law_data = {
-    "ownership_concepts": {
-        "title": "Ownership Concepts",
-        "definition": "Ownership refers to the legal right to possess, use, and dispose of property. In land law, ownership can be absolute or qualified.",
-        "key_points": [
-            "Absolute ownership gives complete control over the property",
-            "Qualified ownership has restrictions or conditions",
-            "Ownership can be transferred through sale, gift, or inheritance",
-            "The concept of 'bundle of rights' includes possession, control, exclusion, and disposition"
-        ],
-        "diagram_data": {
-            "labels": ["Possession", "Control", "Exclusion", "Disposition", "Enjoyment"],
-            "values": [30, 25, 20, 15, 10]
-        }
-    },
-    "easements": {
-        "title": "Easements",
-        "definition": "An easement is a non-possessory right to use another person's land for a specific purpose without taking anything from the land.",
-        "key_points": [
-            "Right of way (most common type)",
-            "Right to light",
-            "Right of support",
-            "Easements must be created by grant, prescription, or implication",
-            "Dominant tenement (benefits) vs Servient tenement (burdened)"
-        ],
-        "diagram_data": {
-            "types": ["Right of Way", "Right to Light", "Easement of Support", "Easement of Parking"],
-            "frequency": [45, 25, 20, 10]
-        }
-    },
-    "leasehold": {
-        "title": "Leasehold Estate",
-        "definition": "A leasehold estate gives the tenant (lessee) the right to possess and use the property for a fixed period of time, as specified in the lease agreement.",
-        "key_points": [
-            "Fixed-term tenancy",
-            "Periodic tenancy",
-            "Tenancy at will",
-            "Tenancy at sufferance",
-            "Essential requirements: parties, property description, term, rent"
-        ],
-        "diagram_data": {
-            "categories": ["Fixed Term", "Periodic", "At Will", "At Sufferance"],
-            "duration_years": [5, 2, 0.5, 0.25]
-        }
-    },
-    "covenants": {
-        "title": "Covenants in Land Law",
-        "definition": "A covenant is a promise made in a deed or other instrument by one party to do or not do certain things concerning the use of land.",
-        "key_points": [
-            "Positive covenants (require action)",
-            "Negative/restrictive covenants (prohibit action)",
-            "Covenants run with the land",
-            "Touch and concern requirement",
-            "Privity of estate"
-        ],
-        "diagram_data": {
-            "stages": ["Creation", "Enforcement", "Modification", "Termination"],
-            "complexity": [8, 9, 7, 6]
-        }
-    },
-    "adverse_possession": {
-        "title": "Adverse Possession",
-        "definition": "Adverse possession, also known as squatter's rights, allows a person to claim ownership of land by occupying it for a specified period without the owner's permission.",
-        "key_points": [
-            "Actual possession",
-            "Open and notorious",
-            "Hostile possession",
-            "Exclusive possession",
-            "Continuous possession for statutory period"
-        ],
-        "diagram_data": {
-            "years": [1, 5, 10, 15, 20],
-            "success_rate": [5, 20, 50, 80, 95]
-        }
-    },
-    "mortgages": {
-        "title": "Mortgages and Charges",
-        "definition": "A mortgage is a security interest in real property held by a lender as security for a debt, usually a loan of money.",
-        "key_points": [
-            "Mortgagor (borrower) vs Mortgagee (lender)",
-            "Equity of redemption",
-            "Foreclosure proceedings",
-            "Power of sale",
-            "Registration requirements"
-        ],
-        "diagram_data": {
-            "parties": ["Mortgagor Rights", "Mortgagee Rights", "Third Party Interests"],
-            "priority": [40, 45, 15]
-        }
-    },
-    "registration": {
-        "title": "Land Registration Systems",
-        "definition": "Land registration systems provide a public record of interests in land and their ownership, making conveyancing simpler and more secure.",
-        "key_points": [
-            "Torrens system (title by registration)",
-            "Deeds registration system",
-            "Indefeasibility of title",
-            "Mirror principle",
-            "Curtain principle"
-        ],
-        "diagram_data": {
-            "systems": ["Torrens System", "Deeds System", "Title Insurance"],
-            "adoption_rate": [70, 25, 5]
-        }
-    }
-}
-
-# Function to create diagrams
-def create_diagram(topic_key):
-    data = land_law_data[topic_key]["diagram_data"]
-    
-    if topic_key == "ownership_concepts":
-        fig = go.Figure(data=[go.Pie(
-            labels=data["labels"],
-            values=data["values"],
-            hole=0.3,
-            marker_colors=px.colors.qualitative.Set3
-        )])
-        fig.update_layout(
-            title="Bundle of Rights in Ownership",
-            height=400
-        )
-        return fig
-    
-    elif topic_key == "easements":
-        fig = px.bar(
-            x=data["types"],
-            y=data["frequency"],
-            title="Types of Easements and Their Frequency",
-            labels={'x': 'Easement Type', 'y': 'Frequency (%)'},
-            color=data["types"],
-            color_discrete_sequence=px.colors.qualitative.Pastel
-        )
-        return fig
-    
-    elif topic_key == "leasehold":
-        fig = px.line(
-            x=data["categories"],
-            y=data["duration_years"],
-            title="Typical Duration of Leasehold Types",
-            markers=True,
-            line_shape='spline'
-        )
-        fig.update_traces(line=dict(width=3))
-        return fig
-    
-    elif topic_key == "covenants":
-        fig = px.area(
-            x=data["stages"],
-            y=data["complexity"],
-            title="Complexity at Different Stages of Covenant",
-            line_shape='spline'
-        )
-        return fig
-    
-    elif topic_key == "adverse_possession":
-        fig = px.scatter(
-            x=data["years"],
-            y=data["success_rate"],
-            title="Success Rate of Adverse Possession Claims Over Time",
-            trendline="ols",
-            size=data["years"]
-        )
-        return fig
-    
-    elif topic_key == "mortgages":
-        fig = px.pie(
-            values=data["priority"],
-            names=data["parties"],
-            title="Priority of Interests in Mortgage Transactions",
-            hole=0.4
-        )
-        return fig
-    
-    elif topic_key == "registration":
-        fig = px.bar_polar(
-            r=data["adoption_rate"],
-            theta=data["systems"],
-            title="Adoption Rate of Land Registration Systems",
-            color=data["systems"],
-            template="plotly_dark"
-        )
-        return fig
+# Land Law Data, read from the on-disk content store
+content_store = get_content_store()
+
+# Fill the shared caches in the background; a no-op after the first run in this process
+start_warmup()
+
+# Cases listed per page of the case browser
+CASES_PAGE_SIZE = 20
+
+# Display width of the sidebar logo in CSS pixels
+LOGO_WIDTH = 100
+
+@st.cache_resource(show_spinner=False)
+def get_logo_url():
+    """Publish the downscaled logo once per process; None if static/ is not writable"""
+    try:
+        return publish_image("logo.png", LOGO_WIDTH)
+    except OSError:
+        return None
+
+# Pseudo topic keys for the flashcard study page, the chart overview and the case browser
+FLASHCARDS = "__flashcards__"
+OVERVIEW = "__overview__"
+CASES = "__cases__"
+
+# Fragment key of the topic pane, so buttons outside it can rerun just the pane
+TOPIC_PANE = "topic_pane"
+
+def learner_id():
+    """Id that flashcard progress is saved under, kept in the URL so a bookmark resumes it"""
+    learner = st.query_params.get("learner")
+    if not learner:
+        learner = st.query_params["learner"] = uuid.uuid4().hex[:16]
+    return learner
+
+def open_flashcards(topic_keys=()):
+    """Button callback: study the flashcards of the given topics (all when empty)"""
+    st.session_state.flashcard_topics = list(topic_keys)
+    st.session_state.current_topic = FLASHCARDS
+
+def reveal_card(card_id):
+    st.session_state.flashcard_revealed = card_id
+
+def grade_card(learner, card_id, quality):
+    """Button callback: record a self-graded answer and move to the next card"""
+    get_flashcard_service().answer(learner, card_id, quality)
+    st.session_state.flashcard_revealed = None
+
+def check_quiz_answer(learner, card, choice):
+    """Button callback: mark a multiple-choice answer and schedule the card by it"""
+    correct = choice == card.back
+    get_flashcard_service().answer(learner, card.card_id, GRADES["Good"] if correct else GRADES["Again"])
+    st.session_state.flashcard_feedback = (correct, card.back)
+
+def reset_case_page():
+    """Filter callback: show the first page of the new case results"""
+    st.session_state.cases_page = 0
+
+def open_topic(topic_key):
+    """Button callback: show a topic in the topic pane (None shows the homepage)"""
+    st.session_state.current_topic = topic_key
+
+def open_topic_in_pane(topic_key):
+    """Button callback outside the topic pane: open a topic and rerun only the pane"""
+    open_topic(topic_key)
+    # A keyed rerun from a callback replaces the click's default rerun (the app, or the
+    # fragment holding the button) with a run of the topic pane alone
+    st.rerun(TOPIC_PANE)
+
+def open_flashcards_in_pane():
+    """Sidebar button callback: study every topic's flashcards, rerunning only the pane"""
+    open_flashcards()
+    st.rerun(TOPIC_PANE)
 
 # Main App
 def main():
@@ -270,33 +112,108 @@ def main():
     
     # Sidebar
     with st.sidebar:
-        st.image("https://cdn-icons-png.flaticon.com/512/2091/2091340.png", width=100)
+        # Bundled logo from static serving: no outbound fetch, cached by the browser
+        logo_url = get_logo_url()
+        if logo_url:
+            st.markdown(f'<img src="{logo_url}" width="{LOGO_WIDTH}" alt="Land Law Notes">',
+                        unsafe_allow_html=True)
+        else:
+            st.image(asset_path("logo.png"), width=LOGO_WIDTH)
         st.markdown("### 📚 Topics")
         st.markdown("---")
-        
-        # Create buttons for each topic
-        for topic_key, topic_info in land_law_data.items():
-            if st.button(f"📖 {topic_info['title']}", key=f"btn_{topic_key}", use_container_width=True):
-                st.session_state.current_topic = topic_key
+        sidebar_navigation()
+        st.button("🃏 Study Flashcards", key="open_flashcards", use_container_width=True,
+                  on_click=open_flashcards_in_pane)
+        st.button("📈 Charts Overview", key="open_overview", use_container_width=True,
+                  on_click=open_topic_in_pane, args=(OVERVIEW,))
+        st.button("⚖️ Case Law", key="open_cases", use_container_width=True,
+                  on_click=open_topic_in_pane, args=(CASES,))
         
         st.markdown("---")
         st.markdown("### 📊 Quick Stats")
-        st.metric("Total Topics", len(land_law_data))
-        st.metric("Key Concepts", sum(len(info['key_points']) for info in land_law_data.values()))
+        corpus = content_store.corpus()
+        st.metric("Total Topics", corpus.total_topics)
+        st.metric("Key Concepts", corpus.total_key_points)
         
         st.markdown("---")
-        st.markdown("### 📥 Export Options")
-        if st.button("📄 Export Notes as Text"):
-            export_notes()
+        st.toggle("🪶 Lite mode (static charts)", key="lite_mode",
+                  help="Show charts as small images; interactive charts load on request")
         
-        if st.button("📈 Export All Diagrams"):
-            export_all_diagrams()
+        st.markdown("---")
+        export_panel()
+        debug_panel()
     
     # Main content area
-    if st.session_state.current_topic:
-        display_topic_content(st.session_state.current_topic)
-    else:
-        display_homepage()
+    topic_pane()
+
+@st.fragment
+def sidebar_navigation():
+    """One page of sidebar topic buttons; filtering and paging rerun only this fragment"""
+    # Opening a topic changes the topic pane, outside this fragment, so its callback reruns the pane
+    topic_navigator(content_store.corpus(), "btn", open_topic_in_pane, prefix="📖 ")
+
+@st.fragment(key=TOPIC_PANE)
+def topic_pane():
+    """Homepage or topic page; navigating inside it reruns only this fragment"""
+    with span("topic_pane"):
+        # The open topic may have been removed by a content reload
+        if st.session_state.current_topic == FLASHCARDS:
+            display_flashcards()
+        elif st.session_state.current_topic == OVERVIEW:
+            display_overview()
+        elif st.session_state.current_topic == CASES:
+            display_cases()
+        elif st.session_state.current_topic in content_store:
+            display_topic_content(st.session_state.current_topic)
+        else:
+            display_homepage()
+
+@st.fragment
+def export_panel():
+    """Sidebar export buttons; clicking them reruns only this fragment"""
+    st.markdown("### 📥 Export Options")
+    manifest = content_store.manifest()
+    selected = st.multiselect(
+        "Topics to export (all if empty)",
+        options=list(manifest),
+        format_func=lambda topic_key: manifest[topic_key]['title']
+    )
+    fmt = st.selectbox("Notes format", list(NOTE_FORMATS), format_func=lambda key: NOTE_FORMATS[key][0])
+    _, extension, mime = NOTE_FORMATS[fmt]
+    
+    # Generated on click into a temporary file; Streamlit takes deferred downloads as bytes, so it is read back
+    st.download_button(
+        "📄 Export Notes",
+        data=lambda: read_export(export_notes(selected, fmt)),
+        file_name=f"land_law_notes.{extension}",
+        mime=mime,
+        on_click="ignore"
+    )
+    
+    # Built only when clicked and served over HTTP rather than the websocket
+    st.download_button(
+        "📈 Export Diagrams",
+        data=lambda: read_export(export_all_diagrams(selected)),
+        file_name="land_law_diagrams.zip",
+        mime="application/zip",
+        on_click="ignore"
+    )
+
+@st.fragment
+def search_panel():
+    """Search box and results; typing reruns only this fragment"""
+    st.markdown("### 🔍 Search Notes")
+    search_term = st.text_input("Enter search term:")
+    if search_term:
+        with span("search"):
+            search_results = get_search_index(content_store.version).search(search_term)
+        
+        if search_results:
+            st.write("Found in:", ", ".join(result['title'] for result in search_results))
+            for result in search_results:
+                st.markdown(f"**{result['title']}** · _{result['field']}_  \n{result['snippet']}")
+        else:
+            st.write("No results found")
 
 def display_homepage():
     col1, col2 = st.columns([2, 1])
@@ -320,303 +237,237 @@ def display_homepage():
         """)
         
         st.markdown("### 📈 Overview of Topics")
-        topics_df = pd.DataFrame({
-            'Topic': [info['title'] for info in land_law_data.values()],
-            'Key Points': [len(info['key_points']) for info in land_law_data.values()],
-            'Complexity': [3, 4, 2, 4, 5, 4, 3]  # Example complexity ratings
-        })
-        st.dataframe(topics_df, use_container_width=True)
+        # Built once per content version from the corpus manifest
+        st.dataframe(content_store.corpus().table(), use_container_width=True)
     
     with col2:
         st.markdown("### 🎯 Quick Navigation")
         
-        # Quick topic buttons
-        cols = st.columns(2)
-        for idx, (topic_key, topic_info) in enumerate(land_law_data.items()):
-            with cols[idx % 2]:
-                if st.button(topic_info['title'], key=f"home_{topic_key}"):
-                    st.session_state.current_topic = topic_key
-                    st.rerun()
+        # Quick topic buttons, one page at a time; the callback reruns this fragment
+        topic_navigator(content_store.corpus(), "home", open_topic, columns=2, page_size=8)
         
         st.markdown("---")
-        st.markdown("### 🔍 Search Notes")
-        search_term = st.text_input("Enter search term:")
-        if search_term:
-            search_results = []
-            for topic_key, topic_info in land_law_data.items():
-                if (search_term.lower() in topic_info['definition'].lower() or 
-                    any(search_term.lower() in point.lower() for point in topic_info['key_points'])):
-                    search_results.append(topic_info['title'])
-            
-            if search_results:
-                st.write("Found in:", ", ".join(search_results))
-            else:
-                st.write("No results found")
+        search_panel()
 
 def display_topic_content(topic_key):
-    topic = land_law_data[topic_key]
+    entry = content_store.manifest()[topic_key]
+    # Definition, key points, explanation and cases, precompiled into two HTML fragments
+    head, body = create_topic_html(topic_key)
     
     # Header with back button
     col1, col2 = st.columns([6, 1])
     with col1:
-        st.markdown(f'<div class="sub-header">{topic["title"]}</div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="sub-header">{html.escape(entry["title"])}</div>', unsafe_allow_html=True)
     with col2:
-        if st.button("← Back"):
-            st.session_state.current_topic = None
-            st.rerun()
-    
-    # Definition
-    st.markdown("### 📝 Definition")
-    st.markdown(f'<div class="definition-box">{topic["definition"]}</div>', unsafe_allow_html=True)
+        st.button("← Back", on_click=open_topic, args=(None,))
     
-    # Key Points
-    st.markdown("### 🔑 Key Points")
-    for point in topic["key_points"]:
-        st.markdown(f"✅ {point}")
+    st.markdown(head, unsafe_allow_html=True)
     
     # Diagram
+    if entry["has_diagram"]:
+        display_diagram(topic_key)
+    
+    st.markdown(body, unsafe_allow_html=True)
+
+    # Related Topics, read from the table precomputed with the search index
+    related = get_search_index(content_store.version).related(topic_key, limit=3)
+    if related:
+        st.markdown("### 🔗 Related Topics")
+        cols = st.columns(len(related))
+        for col, item in zip(cols, related):
+            with col:
+                st.button(item['title'], key=f"related_{item['topic_key']}", use_container_width=True,
+                          on_click=open_topic, args=(item['topic_key'],),
+                          help=f"Similarity {item['score']:.2f}")
+
+    # Study Tips
+    st.markdown("""
+### 🎓 Study Tips
+1. Create flashcards for key definitions
+2. Draw diagrams to visualize relationships
+3. Practice applying concepts to hypotheticals
+4. Review landmark cases for each topic
+5. Understand policy reasons behind rules
+""")
+    st.button("🃏 Study this topic's flashcards", on_click=open_flashcards, args=([topic_key],))
+
+def display_diagram(topic_key):
+    """A topic's chart: a static image in lite mode, otherwise the interactive Plotly chart"""
     st.markdown("### 📊 Visual Representation")
     st.markdown('<div class="diagram-container">', unsafe_allow_html=True)
-    fig = create_diagram(topic_key)
-    st.plotly_chart(fig, use_container_width=True)
+    if st.session_state.lite_mode:
+        with span("static_chart"):
+            st.image(create_static_diagram(topic_key), width="stretch")
+        # The interactive chart, and plotly.js with it, load only when asked for
+        show_interactive = st.toggle("Interactive chart", key=f"interactive_{topic_key}")
+    else:
+        show_interactive = True
+    if show_interactive:
+        fig = create_chart_spec(topic_key)
+        with span("plotly_chart"):
+            st.plotly_chart(fig, use_container_width=True)
     st.markdown('</div>', unsafe_allow_html=True)
+
+def display_overview():
+    """Every topic's chart on one page, sent as a single subplot figure per page of topics"""
+    col1, col2 = st.columns([6, 1])
+    with col1:
+        st.markdown('<div class="sub-header">📈 Charts Overview</div>', unsafe_allow_html=True)
+    with col2:
+        st.button("← Back", on_click=open_topic, args=(None,))
     
-    # Detailed Explanation
-    st.markdown("### 📖 Detailed Explanation")
-    
-    # Different explanations for different topics
-    explanations = {
-        "ownership_concepts": """
-        **Ownership Concepts in Detail:**
-        
-        Ownership in land law is often described as a "bundle of rights." This metaphor helps understand 
-        that ownership isn't a single right but a collection of different rights:
-        
-        1. **Right to Possess**: Physical control over the property
-        2. **Right to Use**: How the property can be utilized
-        3. **Right to Exclude**: Ability to prevent others from entering
-        4. **Right to Dispose**: Ability to sell, gift, or transfer
-        5. **Right to Enjoy**: Freedom from interference
-        
-        **Types of Ownership:**
-        - **Fee Simple Absolute**: Highest form of ownership
-        - **Life Estate**: Ownership for duration of a person's life
-        - **Fee Tail**: Restricted inheritance patterns
-        - **Future Interests**: Rights that become possessory in the future
-        """,
-        
-        "easements": """
-        **Easements Explained:**
-        
-        An easement creates a non-possessory interest in another's land. Key characteristics:
-        
-        **Essential Elements:**
-        1. There must be a dominant and servient tenement
-        2. The easement must accommodate the dominant tenement
-        3. The tenements must be owned/occupied by different persons
-        4. The easement must be capable of forming the subject matter of a grant
-        
-        **Creation Methods:**
-        - **Express Grant**: Written agreement between parties
-        - **Prescription**: Long use without permission
-        - **Implied Grant**: Necessity or common intention
-        - **Statute**: Created by legislation
-        
-        **Termination:**
-        - Release by the dominant owner
-        - Unity of ownership
-        - Abandonment
-        - Expiration of purpose
-        """,
-        
-        "leasehold": """
-        **Leasehold Estate Details:**
-        
-        A leasehold is a contractual arrangement creating a landlord-tenant relationship.
-        
-        **Essential Requirements:**
-        1. **Exclusive Possession**: Tenant must have exclusive control
-        2. **Fixed Term**: Definite period or periodic arrangement
-        3. **Rent**: Consideration (though not always required)
-        
-        **Types of Tenancies:**
-        - **Fixed Term**: Specific end date
-        - **Periodic**: Renews automatically (month-to-month)
-        - **Tenancy at Will**: No fixed term, terminable by either party
-        - **Tenancy at Sufferance**: Holdover after lease expires
-        
-        **Rights and Duties:**
-        - **Landlord's duties**: Quiet enjoyment, repairs (in some cases)
-        - **Tenant's duties**: Pay rent, avoid waste, return possession
-        """,
-        
-        "covenants": """
-        **Covenants in Depth:**
-        
-        Covenants can be either positive (requiring action) or negative (prohibiting action).
-        
-        **Requirements for Running with Land:**
-        1. **Touch and Concern**: Must affect land value/use
-        2. **Intent**: Original parties must intend it to run
-        3. **Notice**: Subsequent purchasers must have notice
-        4. **Privity**: Legal relationship between parties
-        
-        **Enforcement:**
-        - **At Law**: Between original covenantor and covenantee
-        - **In Equity**: Against subsequent owners with notice
-        - **Defenses**: Changed circumstances, acquiescence, statutory modification
-        
-        **Common Examples:**
-        - Building restrictions
-        - Maintenance obligations
-        - Use restrictions (residential only)
-        - Architectural controls
-        """,
-        
-        "adverse_possession": """
-        **Adverse Possession Requirements:**
-        
-        To successfully claim adverse possession, all elements must be proven:
-        
-        1. **Actual Possession**: Physical occupation and control
-        2. **Open and Notorious**: Visible and obvious to true owner
-        3. **Hostile/Adverse**: Without owner's permission
-        4. **Exclusive**: Not shared with true owner
-        5. **Continuous**: Uninterrupted for statutory period
-        
-        **Statutory Periods Vary:**
-        - Typically 10-20 years depending on jurisdiction
-        - Some jurisdictions require payment of taxes
-        - Color of title may reduce required period
-        
-        **Policy Justifications:**
-        - Encourages land use
-        - Resolves stale claims
-        - Protects settled expectations
-        - Quietens title
-        """,
-        
-        "mortgages": """
-        **Mortgage Law Principles:**
-        
-        A mortgage involves transferring an interest in land as security for debt.
-        
-        **Key Concepts:**
-        - **Equity of Redemption**: Borrower's right to repay and reclaim property
-        - **Foreclosure**: Court-ordered termination of redemption rights
-        - **Power of Sale**: Lender's right to sell without court order
-        - **Priority Rules**: Determine order of payment among creditors
-        
-        **Types of Mortgages:**
-        - **First Mortgage**: Highest priority
-        - **Second Mortgage**: Subordinate position
-        - **Reverse Mortgage**: Payments to homeowner
-        - **Chattel Mortgage**: On personal property
-        
-        **Default Remedies:**
-        - Judicial foreclosure
-        - Non-judicial foreclosure
-        - Strict foreclosure
-        - Deed in lieu of foreclosure
-        """,
-        
-        "registration": """
-        **Land Registration Systems:**
-        
-        Modern systems aim to simplify conveyancing and provide certainty.
-        
-        **Torrens System Features:**
-        1. **Mirror Principle**: Register reflects all interests
-        2. **Curtain Principle**: No need to investigate past transactions
-        3. **Insurance Principle**: State guarantees title
-        4. **Indefeasibility**: Registered title is secure
-        
-        **Registration Types:**
-        - **Title Registration**: Registers ownership itself
-        - **Deeds Registration**: Registers documents affecting title
-        - **Plurality Systems**: Combine elements of both
-        
-        **Advantages:**
-        - Security of title
-        - Simplified transactions
-        - Reduced investigation costs
-        - Fraud prevention
-        - Marketability improvement
-        """
-    }
+    pages = overview_pages(content_store.corpus())
+    if not pages:
+        st.info("No topic has a chart yet.")
+        return
+    total = sum(len(topic_keys) for topic_keys in pages)
+    page = 0
+    if len(pages) > 1:
+        page_size = len(pages[0])
+        page = st.selectbox("Charts", range(len(pages)), key="overview_page",
+                            format_func=lambda i: f"Topics {i * page_size + 1}–"
+                                                  f"{i * page_size + len(pages[i])} of {total}")
+    fig = create_overview_spec(pages[page])
+    with span("plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
+
+def display_cases():
+    """Case law browser: filter by text, topic and year range, with a timeline of the matches"""
+    col1, col2 = st.columns([6, 1])
+    with col1:
+        st.markdown('<div class="sub-header">⚖️ Case Law</div>', unsafe_allow_html=True)
+    with col2:
+        st.button("← Back", on_click=open_topic, args=(None,))
     
-    st.markdown(f'<div class="important-note">{explanations.get(topic_key, "Detailed explanation coming soon...")}</div>', unsafe_allow_html=True)
+    index = content_store.cases()
+    if not len(index):
+        st.info("No cases have been added yet.")
+        return
+    manifest = content_store.manifest()
+    topic_keys = [topic_key for topic_key in manifest if topic_key in index.by_topic]
+    col1, col2 = st.columns(2)
+    with col1:
+        text = st.text_input("Search cases and holdings", key="cases_query", on_change=reset_case_page)
+    with col2:
+        topic_key = st.selectbox("Topic", [None] + topic_keys, key="cases_topic", on_change=reset_case_page,
+                                 format_func=lambda key: "All topics" if key is None else manifest[key]["title"])
+    start, end = index.first_year, index.last_year
+    if start < end:
+        start, end = st.slider("Decided between", start, end, (start, end), key="cases_years",
+                               on_change=reset_case_page)
     
-    # Case Examples (when applicable)
-    if topic_key in ["easements", "covenants", "adverse_possession"]:
-        st.markdown("### ⚖️ Case Examples")
-        if topic_key == "easements":
-            st.markdown("""
-            **Famous Cases:**
-            - *Re Ellenborough Park* (1956): Established requirements for valid easement
-            - *Wheeldon v Burrows* (1879): Implied easements on severance
-            - *Hill v Tupper* (1863): Commercial benefit doesn't create easement
-            """)
-        elif topic_key == "covenants":
-            st.markdown("""
-            **Landmark Cases:**
-            - *Tulk v Moxhay* (1848): Established restrictive covenants in equity
-            - *Austerberry v Corporation of Oldham* (1885): Positive covenants don't run at law
-            - *Rhone v Stephens* (1994): Modern approach to covenant enforcement
-            """)
+    with span("case_query"):
+        cases = index.query(text, topic_key, start, end)
+    if not cases:
+        st.info("No cases match these filters.")
+        return
+    fig = create_case_timeline_spec(text, topic_key, start, end)
+    with span("plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
     
-    # Study Tips
-    st.markdown("### 🎓 Study Tips")
-    st.markdown("""
-    1. Create flashcards for key definitions
-    2. Draw diagrams to visualize relationships
-    3. Practice applying concepts to hypotheticals
-    4. Review landmark cases for each topic
-    5. Understand policy reasons behind rules
-    """)
-
-def export_notes():
-    """Export all notes as a text file"""
-    notes_text = "LAND LAW NOTES - COMPREHENSIVE GUIDE\n"
-    notes_text += "=" * 50 + "\n\n"
+    pages = range(0, len(cases), CASES_PAGE_SIZE)
+    page = 0
+    if len(pages) > 1:
+        page = st.selectbox("Results", range(len(pages)), key="cases_page",
+                            format_func=lambda i: f"Cases {pages[i] + 1}–"
+                                                  f"{min(pages[i] + CASES_PAGE_SIZE, len(cases))} of {len(cases)}")
+    else:
+        st.caption(f"{len(cases)} case{'s' if len(cases) != 1 else ''}")
+    for case in cases[pages[page]:pages[page] + CASES_PAGE_SIZE]:
+        topics = ", ".join(manifest[key]["title"] for key in case.topics if key in manifest)
+        st.markdown(f"**{case.name}** ({case.year}) · {topics}  \n{case.holding}")
+
+def display_flashcards():
+    """Spaced-repetition study page for the selected topics' flashcards"""
+    deck = get_flashcard_deck(content_store.version)
+    service = get_flashcard_service()
+    learner = learner_id()
     
-    for topic_key, topic_info in land_law_data.items():
-        notes_text += f"TOPIC: {topic_info['title']}\n"
-        notes_text += "-" * 30 + "\n"
-        notes_text += f"Definition: {topic_info['definition']}\n\n"
-        notes_text += "Key Points:\n"
-        for point in topic_info['key_points']:
-            notes_text += f"  • {point}\n"
-        notes_text += "\n" + "=" * 50 + "\n\n"
+    col1, col2 = st.columns([6, 1])
+    with col1:
+        st.markdown('<div class="sub-header">🃏 Flashcards</div>', unsafe_allow_html=True)
+    with col2:
+        st.button("← Back", on_click=open_topic, args=(None,))
     
-    # Create download link
-    b64 = base64.b64encode(notes_text.encode()).decode()
-    href = f'<a href="data:file/txt;base64,{b64}" download="land_law_notes.txt">Click to download notes</a>'
-    st.sidebar.markdown(href, unsafe_allow_html=True)
-
-def export_all_diagrams():
-    """Export all diagrams as HTML"""
-    import plotly.io as pio
+    manifest = content_store.manifest()
+    if 'flashcard_topics' not in st.session_state:
+        st.session_state.flashcard_topics = []
+    st.session_state.flashcard_topics = [key for key in st.session_state.flashcard_topics if key in manifest]
+    scope = st.multiselect(
+        "Topics to study (all if empty)",
+        options=list(manifest),
+        format_func=lambda topic_key: manifest[topic_key]['title'],
+        key="flashcard_topics"
+    )
+    quiz = st.toggle("Quiz me (multiple choice)", key="flashcard_quiz")
     
-    html_content = "<html><head><title>Land Law Diagrams</title></head><body>"
-    html_content += "<h1>Land Law - All Diagrams</h1>"
+    with span("flashcard_queue"):
+        due, new = service.counts(learner, deck, scope)
+        card = service.next_card(learner, deck, scope)
+    col1, col2 = st.columns(2)
+    col1.metric("Due now", due)
+    col2.metric("New", new)
     
-    for topic_key, topic_info in land_law_data.items():
-        html_content += f"<h2>{topic_info['title']}</h2>"
-        fig = create_diagram(topic_key)
-        html_content += pio.to_html(fig, full_html=False)
-        html_content += "<hr>"
+    feedback = st.session_state.pop("flashcard_feedback", None)
+    if feedback:
+        correct, answer = feedback
+        if correct:
+            st.success("Correct!")
+        else:
+            st.error(f"Not quite. The answer was: {answer}")
     
-    html_content += "</body></html>" 
+    if card is None:
+        st.success("All caught up! Come back later for your next reviews.")
+        return
     
+    st.caption(manifest[card.topic_key]['title'])
+    st.markdown(f'<div class="definition-box">{markdown_to_html(card.front)}</div>', unsafe_allow_html=True)
     
-    # Create download link
-    b64 = base64.b64encode(html_content.encode()).decode()
-    href = f'<a href="data:file/html;base64,{b64}" download="land_law_diagrams.html">Download all diagrams</a>'
-    st.sidebar.markdown(href, unsafe_allow_html=True)
+    if quiz:
+        choice = st.radio("Your answer", deck.choices(card), index=None, key=f"quiz_{card.card_id}")
+        st.button("Check answer", disabled=choice is None, on_click=check_quiz_answer,
+                  args=(learner, card, choice))
+    elif st.session_state.get("flashcard_revealed") == card.card_id:
+        st.markdown(f'<div class="important-note">{html.escape(card.back)}</div>', unsafe_allow_html=True)
+        st.markdown("How well did you remember it?")
+        cols = st.columns(len(GRADES))
+        for col, (label, quality) in zip(cols, GRADES.items()):
+            with col:
+                st.button(label, key=f"grade_{label}", use_container_width=True,
+                          on_click=grade_card, args=(learner, card.card_id, quality))
+    else:
+        st.button("Show answer", on_click=reveal_card, args=(card.card_id,))
+
+def export_notes(topic_keys=None, fmt="txt"):
+    """Export the notes for the given topics (all when empty) and return the file"""
+    with span("export_notes"):
+        topic_keys = topic_keys or list(content_store.manifest())
+        topics = ((topic_key, content_store.get(topic_key)) for topic_key in topic_keys)
+        return write_notes(topics, fmt)
+
+def plotlyjs_path():
+    """Path of the plotly.js bundle shipped inside the installed plotly package"""
+    import plotly
+    return os.path.join(os.path.dirname(plotly.__file__), "package_data", "plotly.min.js")
+
+def export_all_diagrams(topic_keys=None):
+    """Export the diagrams for the given topics (all when empty) as a zip and return it"""
+    with span("export_all_diagrams"):
+        exporter = get_diagram_exporter()
+        targets = exporter.ensure(content_store, topic_keys or list(content_store.manifest()))
+        if not topic_keys:
+            # A full export knows every current artifact, so older ones can go
+            exporter.prune(targets.values())
+        return exporter.write_zip(targets, plotlyjs_path())
+
+def read_export(export_file):
+    """Contents of an export file; deferred downloads take bytes, not open temporary files"""
+    with export_file:
+        return export_file.read()
 
 # Run the app
 if __name__ == "__main__":
-    main() 
+    with span("script"):
+        main()
     
   
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""Minimal, escaping Markdown-to-HTML conversion for topic text
+
+Covers what the topic content uses: paragraphs, **bold**, *italic*,
+bulleted and numbered lists and ### headings. All text is HTML-escaped
+before any markup is added, so content can never inject tags.
+"""
+
+import html
+import re
+
+BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+ITALIC_RE = re.compile(r"\*(.+?)\*")
+BULLET_RE = re.compile(r"^[-•]\s+(.*)$")
+NUMBERED_RE = re.compile(r"^\d+\.\s+(.*)$")
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.*)$")
+
+
+def inline_html(text):
+    """Escape text and apply bold/italic markup"""
+    text = html.escape(text, quote=False)
+    text = BOLD_RE.sub(r"<strong>\1</strong>", text)
+    return ITALIC_RE.sub(r"<em>\1</em>", text)
+
+
+def markdown_to_html(text):
+    """Convert a block of topic Markdown to an HTML string"""
+    parts = []
+    open_list = None
+    paragraph = []
+
+    def flush_paragraph():
+        if paragraph:
+            parts.append(f"<p>{'<br>'.join(inline_html(line) for line in paragraph)}</p>")
+            paragraph.clear()
+
+    def close_list():
+        nonlocal open_list
+        if open_list:
+            parts.append(f"</{open_list}>")
+            open_list = None
+
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        bullet = BULLET_RE.match(line)
+        numbered = NUMBERED_RE.match(line)
+        heading = HEADING_RE.match(line)
+        if not line:
+            flush_paragraph()
+            close_list()
+        elif bullet or numbered:
+            flush_paragraph()
+            tag = "ul" if bullet else "ol"
+            if open_list != tag:
+                close_list()
+                parts.append(f"<{tag}>")
+                open_list = tag
+            parts.append(f"<li>{inline_html((bullet or numbered).group(1))}</li>")
+        elif heading:
+            flush_paragraph()
+            close_list()
+            level = len(heading.group(1))
+            parts.append(f"<h{level}>{inline_html(heading.group(2))}</h{level}>")
+        else:
+            close_list()
+            paragraph.append(line)
+    flush_paragraph()
+    close_list()
+    return "".join(parts)
+
+
+def markdown_to_text(text):
+    """Strip emphasis markers so Markdown reads cleanly as plain text"""
+    return text.replace("**", "").replace("*", "")
@@ -0,0 +1,76 @@
+"""Paginated, filterable topic navigation
+
+Only one page of topic buttons is rendered per run, grouped under their
+category headings, so the number of widgets stays the same however many
+topics the corpus holds.
+"""
+
+import math
+from contextlib import nullcontext
+from itertools import groupby
+
+import streamlit as st
+
+# Topic buttons rendered per page
+PAGE_SIZE = 10
+
+ALL_CATEGORIES = "All categories"
+
+
+def _reset_page(key):
+    st.session_state[f"{key}_page"] = 0
+
+
+def _turn_page(key, step):
+    st.session_state[f"{key}_page"] += step
+
+
+def topic_navigator(corpus, key, on_select, columns=1, page_size=PAGE_SIZE, prefix=""):
+    """Render one page of topic buttons; return the clicked topic key, if any
+
+    Buttons are keyed "<key>_<topic key>" and call on_select(topic key) when
+    clicked. The filter, category and page are kept per navigator in session
+    state under "<key>_filter", "<key>_category" and "<key>_page".
+    """
+    st.text_input("Filter topics", key=f"{key}_filter", placeholder="Type to filter…",
+                  label_visibility="collapsed", on_change=_reset_page, args=(key,))
+    category = None
+    if len(corpus.categories) > 1:
+        category = st.selectbox("Category", (ALL_CATEGORIES,) + corpus.categories, key=f"{key}_category",
+                                label_visibility="collapsed", on_change=_reset_page, args=(key,))
+        if category == ALL_CATEGORIES:
+            category = None
+
+    matches = corpus.filter(st.session_state[f"{key}_filter"], category)
+    if not matches:
+        st.caption("No matching topics")
+        return None
+
+    pages = math.ceil(len(matches) / page_size)
+    page = min(st.session_state.setdefault(f"{key}_page", 0), pages - 1)
+    st.session_state[f"{key}_page"] = page
+    visible = matches[page * page_size:(page + 1) * page_size]
+
+    clicked = None
+    for heading, group in groupby(visible, key=lambda i: corpus.columns["category"][i]):
+        if len(corpus.categories) > 1:
+            st.caption(heading)
+        cells = st.columns(columns) if columns > 1 else None
+        for position, i in enumerate(group):
+            topic_key = corpus.keys[i]
+            with cells[position % columns] if cells else nullcontext():
+                if st.button(f"{prefix}{corpus.columns['title'][i]}", key=f"{key}_{topic_key}",
+                             use_container_width=True, on_click=on_select, args=(topic_key,)):
+                    clicked = topic_key
+
+    if pages > 1:
+        previous_col, label_col, next_col = st.columns([1, 2, 1])
+        with previous_col:
+            st.button("◀", key=f"{key}_previous", disabled=page == 0,
+                      on_click=_turn_page, args=(key, -1))
+        with label_col:
+            st.caption(f"Page {page + 1} of {pages} · {len(matches)} topics")
+        with next_col:
+            st.button("▶", key=f"{key}_next", disabled=page == pages - 1,
+                      on_click=_turn_page, args=(key, 1))
+    return clicked
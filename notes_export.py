@@ -0,0 +1,92 @@
+"""Streaming notes export in plain text, Markdown and self-contained HTML
+
+Each format is a generator that yields the document one small chunk at a
+time, so writing it out never holds more than one topic in memory.
+"""
+
+import html
+import tempfile
+
+from markdown_html import markdown_to_html, markdown_to_text
+
+# Format key -> (label, file extension, MIME type)
+NOTE_FORMATS = {
+    "txt": ("Plain text", "txt", "text/plain"),
+    "md": ("Markdown", "md", "text/markdown"),
+    "html": ("HTML", "html", "text/html")
+}
+
+HTML_STYLE = """
+body { font-family: sans-serif; max-width: 50rem; margin: 2rem auto; color: #264653; line-height: 1.5; }
+h1 { color: #2E86AB; text-align: center; }
+h2 { border-left: 5px solid #2A9D8F; padding-left: 15px; margin-top: 2.5rem; }
+.definition-box { background-color: #f8f9fa; padding: 20px; border-radius: 10px; border-left: 5px solid #E76F51; }
+.important-note { background-color: #FFF3CD; padding: 15px; border-radius: 8px; border: 1px solid #FFEAA7; }
+"""
+
+
+def iter_text(topics):
+    yield "LAND LAW NOTES - COMPREHENSIVE GUIDE\n"
+    yield "=" * 50 + "\n\n"
+    for _, topic in topics:
+        yield f"TOPIC: {topic.title}\n"
+        yield "-" * 30 + "\n"
+        yield f"Definition: {topic.definition}\n\n"
+        yield "Key Points:\n"
+        for point in topic.key_points:
+            yield f"  • {point}\n"
+        if topic.explanation:
+            yield f"\nDetailed Explanation:\n{markdown_to_text(topic.explanation)}\n"
+        if topic.cases:
+            yield f"\nCase Examples:\n{markdown_to_text(topic.cases)}\n"
+        yield "\n" + "=" * 50 + "\n\n"
+
+
+def iter_markdown(topics):
+    yield "# Land Law Notes - Comprehensive Guide\n\n"
+    for _, topic in topics:
+        yield f"## {topic.title}\n\n"
+        yield f"**Definition:** {topic.definition}\n\n"
+        yield "### Key Points\n\n"
+        for point in topic.key_points:
+            yield f"- {point}\n"
+        yield "\n"
+        if topic.explanation:
+            yield f"### Detailed Explanation\n\n{topic.explanation}\n\n"
+        if topic.cases:
+            yield f"### Case Examples\n\n{topic.cases}\n\n"
+
+
+def iter_html(topics):
+    yield '<!DOCTYPE html><html><head><meta charset="utf-8"><title>Land Law Notes</title>'
+    yield f"<style>{HTML_STYLE}</style></head><body>"
+    yield "<h1>🏛️ Land Law Notes &amp; Study Guide</h1>"
+    for topic_key, topic in topics:
+        yield f'<h2 id="{html.escape(topic_key)}">{html.escape(topic.title)}</h2>'
+        yield f'<div class="definition-box">{html.escape(topic.definition)}</div>'
+        yield "<h3>Key Points</h3><ul>"
+        for point in topic.key_points:
+            yield f"<li>{html.escape(point)}</li>"
+        yield "</ul>"
+        if topic.explanation:
+            yield f'<h3>Detailed Explanation</h3><div class="important-note">{markdown_to_html(topic.explanation)}</div>'
+        if topic.cases:
+            yield f"<h3>Case Examples</h3>{markdown_to_html(topic.cases)}"
+    yield "</body></html>"
+
+
+FORMAT_WRITERS = {"txt": iter_text, "md": iter_markdown, "html": iter_html}
+
+
+def iter_notes(topics, fmt="txt"):
+    """Yield the notes document for (topic key, topic) pairs in the given format"""
+    return FORMAT_WRITERS[fmt](topics)
+
+
+def write_notes(topics, fmt="txt"):
+    """Stream the notes into a temporary file and return it rewound for reading"""
+    notes_file = tempfile.TemporaryFile()
+    for chunk in iter_notes(topics, fmt):
+        notes_file.write(chunk.encode("utf-8"))
+    notes_file.seek(0)
+    return notes_file
@@ -0,0 +1,98 @@
+"""Precompiled HTML for the static parts of the app's pages
+
+The app's stylesheet is minified once per process. A topic's text never
+changes between reruns, so its page body is rendered once per content
+version into two fragments, sent as one element each: the definition and
+key points above the chart, and the explanation and cases below it. All
+topic text goes through markdown_html, which escapes it before adding any
+markup.
+"""
+
+import re
+
+from markdown_html import inline_html, markdown_to_html
+
+EXPLANATION_PLACEHOLDER = "Detailed explanation coming soon..."
+
+CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+CSS_SPACE_RE = re.compile(r"\s*([{};:,>])\s*")
+
+
+def minify_css(css):
+    """Drop comments and the whitespace around CSS punctuation"""
+    css = CSS_COMMENT_RE.sub("", css)
+    css = CSS_SPACE_RE.sub(r"\1", " ".join(css.split()))
+    return css.replace(";}", "}").strip()
+
+
+PAGE_CSS = """
+    .main-header {
+        font-size: 2.5rem;
+        color: #2E86AB;
+        text-align: center;
+        padding: 1rem;
+        background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
+        border-radius: 10px;
+        margin-bottom: 2rem;
+    }
+    .sub-header {
+        font-size: 1.8rem;
+        color: #264653;
+        border-left: 5px solid #2A9D8F;
+        padding-left: 15px;
+        margin-top: 2rem;
+        margin-bottom: 1rem;
+    }
+    .topic-button {
+        width: 100%;
+        margin: 5px 0;
+        padding: 12px;
+        font-size: 1.1rem;
+        background-color: #2A9D8F;
+        color: white;
+        border: none;
+        border-radius: 8px;
+        transition: all 0.3s;
+    }
+    .topic-button:hover {
+        background-color: #21867A;
+        transform: translateY(-2px);
+    }
+    .definition-box {
+        background-color: #f8f9fa;
+        padding: 20px;
+        border-radius: 10px;
+        border-left: 5px solid #E76F51;
+        margin: 15px 0;
+    }
+    .important-note {
+        background-color: #FFF3CD;
+        padding: 15px;
+        border-radius: 8px;
+        border: 1px solid #FFEAA7;
+        margin: 15px 0;
+    }
+    .diagram-container {
+        background-color: white;
+        padding: 20px;
+        border-radius: 10px;
+        box-shadow: 0 4px 6px rgba(0,0,0,0.1);
+        margin: 20px 0;
+    }
+"""
+
+# A style-only st.html block goes to the page's event container, so it takes no layout space
+PAGE_STYLE = f"<style>{minify_css(PAGE_CSS)}</style>"
+
+
+def topic_fragments(topic):
+    """(head, body) HTML for a topic: definition and key points, then explanation and cases"""
+    head = ("<h3>📝 Definition</h3>"
+            f'<div class="definition-box">{markdown_to_html(topic.definition)}</div>'
+            "<h3>🔑 Key Points</h3>"
+            + "".join(f"<p>✅ {inline_html(point)}</p>" for point in topic.key_points))
+    explanation = markdown_to_html(topic.explanation) if topic.explanation else f"<p>{EXPLANATION_PLACEHOLDER}</p>"
+    body = f'<h3>📖 Detailed Explanation</h3><div class="important-note">{explanation}</div>'
+    if topic.cases:
+        body += f"<h3>⚖️ Case Examples</h3>{markdown_to_html(topic.cases)}"
+    return head, body
@@ -0,0 +1,347 @@
+"""Inverted index used by the "Search Notes" box and the related-topics panel
+
+Matching topics are ranked with BM25 over field-weighted term counts. A
+TF-IDF topic-by-term matrix is built with NumPy once per index, and the
+top few most similar topics for every topic are kept in a small table,
+so a "related topics" lookup never computes a similarity. NumPy is
+imported when an index is built or queried, not when this module is.
+"""
+
+import math
+import re
+from bisect import bisect_left
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+# Suffixes stripped by the stemmer, longest first
+SUFFIXES = ("ations", "ation", "ments", "ment", "ness", "ings", "ing", "ies", "ied",
+            "ers", "er", "es", "ed", "ly", "s")
+
+# Minimum stem length so short words like "use" or "red" stay intact
+MIN_STEM = 3
+
+# Common words ignored in queries unless the query has nothing else
+STOPWORDS = frozenset("a an and are as at be by for from in is it of on or the to with".split())
+
+# Weight of a match in each kind of field when ranking topics
+FIELD_WEIGHTS = {
+    "Title": 5,
+    "Definition": 3,
+    "Key point": 2,
+    "Case": 2,
+    "Explanation": 1
+}
+
+
+# BM25 term-frequency saturation and document-length normalisation
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Shortest query word expanded as a prefix while typing; shorter words match whole stems only
+MIN_PREFIX = 3
+
+# Related topics kept per topic
+RELATED_TOP_K = 5
+# Most widespread terms used for topic similarity, bounding the matrix width
+SIMILARITY_FEATURES = 2048
+# Similarity rows computed at a time, bounding the size of the intermediate block
+SIMILARITY_BLOCK = 256
+
+
+def stem(word):
+    """Strip a common English suffix from a lowercase word"""
+    if word.endswith("'s"):
+        word = word[:-2]
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM:
+            word = word[:-len(suffix)]
+            if suffix == "ies" or suffix == "ied":
+                word += "y"
+            break
+    return word
+
+
+def tokenize(text):
+    """Yield (word, start, end) for every word in text"""
+    for match in TOKEN_RE.finditer(text.lower()):
+        yield match.group(), match.start(), match.end()
+
+
+def clean_markdown(text):
+    """Drop markdown emphasis and list markers so snippets read as plain text"""
+    text = text.replace("**", "").replace("*", "")
+    return re.sub(r"^\s*(?:[-•]|\d+\.)\s+", "", text).strip()
+
+
+def topic_passages(topic):
+    """Split one topic into the (field, text) passages that get indexed"""
+    passages = [("Title", topic.title), ("Definition", topic.definition)]
+    passages += [("Key point", point) for point in topic.key_points]
+    for field, body in (("Explanation", topic.explanation), ("Case", topic.cases)):
+        for line in body.splitlines():
+            line = clean_markdown(line)
+            if line:
+                passages.append((field, line))
+    return passages
+
+
+class SearchIndex:
+    """Stemmed inverted index over topic passages with prefix lookup"""
+
+    def __init__(self, max_prefix_terms=50):
+        self.max_prefix_terms = max_prefix_terms
+        # passage id -> (topic key, field, text); each topic's passages are contiguous
+        self.passages = []
+        # topic index -> id of its first passage (plus one past the last passage at the end)
+        self.passage_starts = []
+        # stem -> {passage id: [(start, end), ...]}, and its passage ids in ascending order
+        self.postings = {}
+        self.posting_ids = {}
+        # sorted surface words and the stem each one maps to, for typeahead
+        self.words = []
+        self.word_stems = {}
+        self.titles = {}
+        # topic index -> position of its title in alphabetical order, the ranking tie-break
+        self.title_ranks = None
+        # topic index <-> topic key, and per-topic field-weighted stem counts while building
+        self.topic_keys = []
+        self.topic_positions = {}
+        self._topic_terms = {}
+        # stem -> (topic indices, field-weighted term counts) as NumPy arrays
+        self.term_topics = {}
+        # stem -> ascending topic indices of stems missing from term_topics (stopwords)
+        self.stopword_topics = {}
+        self.idf = {}
+        self._length_norm = None
+        # topic index -> indices and cosine similarities of its most similar topics
+        self.related_topics = None
+        self.related_scores = None
+
+    @classmethod
+    def build(cls, topics):
+        """Index every topic's title, definition, key points, explanation and cases
+
+        topics is an iterable of (topic key, topic) pairs.
+        """
+        index = cls()
+        for topic_key, topic in topics:
+            index.titles[topic_key] = topic.title
+            index.topic_positions[topic_key] = len(index.topic_keys)
+            index.topic_keys.append(topic_key)
+            index.passage_starts.append(len(index.passages))
+            for field, text in topic_passages(topic):
+                index.add_passage(topic_key, field, text)
+        index.passage_starts.append(len(index.passages))
+        index.words = sorted(index.word_stems)
+        index.posting_ids = {term_stem: list(hits) for term_stem, hits in index.postings.items()}
+        index._build_term_topics()
+        index._build_related()
+        return index
+
+    def add_passage(self, topic_key, field, text):
+        passage_id = len(self.passages)
+        self.passages.append((topic_key, field, text))
+        terms = self._topic_terms.setdefault(topic_key, {})
+        weight = FIELD_WEIGHTS[field]
+        for word, start, end in tokenize(text):
+            word_stem = self.word_stems.get(word)
+            if word_stem is None:
+                word_stem = self.word_stems[word] = stem(word)
+            self.postings.setdefault(word_stem, {}).setdefault(passage_id, []).append((start, end))
+            if word not in STOPWORDS:
+                terms[word_stem] = terms.get(word_stem, 0) + weight
+
+    def _build_term_topics(self):
+        """Turn the per-topic stem counts into per-stem NumPy postings and BM25 statistics"""
+        import numpy as np
+        columns = {}
+        lengths = np.zeros(len(self.topic_keys), dtype=np.float32)
+        for topic_index, topic_key in enumerate(self.topic_keys):
+            terms = self._topic_terms.pop(topic_key, {})
+            lengths[topic_index] = sum(terms.values())
+            for term, count in terms.items():
+                topic_indices, counts = columns.setdefault(term, ([], []))
+                topic_indices.append(topic_index)
+                counts.append(count)
+        topic_count = len(self.topic_keys)
+        for term, (topic_indices, counts) in columns.items():
+            self.term_topics[term] = (np.array(topic_indices, dtype=np.int32),
+                                      np.array(counts, dtype=np.float32))
+            frequency = len(topic_indices)
+            self.idf[term] = math.log(1 + (topic_count - frequency + 0.5) / (frequency + 0.5))
+        # Stopwords carry no BM25 weight but an all-stopword query still has to match
+        for term_stem, hits in self.postings.items():
+            if term_stem not in self.term_topics:
+                topics = sorted({self.topic_positions[self.passages[passage_id][0]] for passage_id in hits})
+                self.stopword_topics[term_stem] = np.array(topics, dtype=np.int32)
+        title_order = sorted(range(topic_count), key=lambda topic_index: self.titles[self.topic_keys[topic_index]])
+        self.title_ranks = np.zeros(topic_count, dtype=np.int32)
+        self.title_ranks[title_order] = np.arange(topic_count, dtype=np.int32)
+        average = float(lengths.mean()) if topic_count else 1.0
+        self._length_norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / (average or 1.0))
+
+    def _build_related(self):
+        """Precompute every topic's most similar topics from a TF-IDF matrix"""
+        import numpy as np
+        topic_count = len(self.topic_keys)
+        top_k = min(RELATED_TOP_K, topic_count - 1)
+        self.related_topics = np.zeros((topic_count, max(top_k, 0)), dtype=np.int32)
+        self.related_scores = np.zeros((topic_count, max(top_k, 0)), dtype=np.float32)
+        if top_k < 1:
+            return
+
+        # A term found in only one topic cannot link two topics
+        shared = [term for term, (topic_indices, _) in self.term_topics.items() if len(topic_indices) > 1]
+        shared.sort(key=lambda term: (-len(self.term_topics[term][0]), term))
+        matrix = np.zeros((topic_count, len(shared[:SIMILARITY_FEATURES])), dtype=np.float32)
+        for column, term in enumerate(shared[:SIMILARITY_FEATURES]):
+            topic_indices, counts = self.term_topics[term]
+            # Sublinear term frequency, so one long section doesn't dominate
+            matrix[topic_indices, column] = (1 + np.log(counts)) * self.idf[term]
+        norms = np.linalg.norm(matrix, axis=1)
+        matrix /= np.where(norms > 0, norms, 1)[:, None]
+
+        for start in range(0, topic_count, SIMILARITY_BLOCK):
+            block = matrix[start:start + SIMILARITY_BLOCK] @ matrix.T
+            rows = np.arange(block.shape[0])
+            # A topic is never related to itself
+            block[rows, start + rows] = -1
+            top = np.argpartition(-block, top_k - 1, axis=1)[:, :top_k]
+            scores = np.take_along_axis(block, top, axis=1)
+            order = np.argsort(-scores, axis=1, kind="stable")
+            self.related_topics[start:start + len(rows)] = np.take_along_axis(top, order, axis=1)
+            self.related_scores[start:start + len(rows)] = np.take_along_axis(scores, order, axis=1)
+
+    def related(self, topic_key, limit=RELATED_TOP_K):
+        """The topics most similar to topic_key, read from the precomputed table"""
+        topic_index = self.topic_positions.get(topic_key)
+        if topic_index is None:
+            return []
+        results = []
+        for other, score in zip(self.related_topics[topic_index][:limit], self.related_scores[topic_index][:limit]):
+            if score <= 0:
+                break
+            other_key = self.topic_keys[other]
+            results.append({"topic_key": other_key, "title": self.titles[other_key], "score": float(score)})
+        return results
+
+    def _bm25(self, stems):
+        """BM25 score of every topic for a set of query stems"""
+        import numpy as np
+        scores = np.zeros(len(self.topic_keys), dtype=np.float32)
+        for term_stem in stems:
+            if term_stem in self.term_topics:
+                topic_indices, counts = self.term_topics[term_stem]
+                scores[topic_indices] += (self.idf[term_stem] * counts * (BM25_K1 + 1)
+                                          / (counts + self._length_norm[topic_indices]))
+        return scores
+
+    def _prefix_stems(self, prefix):
+        """Stems of indexed words starting with prefix (capped for short prefixes)"""
+        stems = set()
+        i = bisect_left(self.words, prefix)
+        while i < len(self.words) and self.words[i].startswith(prefix):
+            stems.add(self.word_stems[self.words[i]])
+            if len(stems) >= self.max_prefix_terms:
+                break
+            i += 1
+        return stems
+
+    def _term_stems(self, term, prefix):
+        """Every stem a query term can match"""
+        stems = {stem(term)}
+        if prefix and len(term) >= MIN_PREFIX:
+            stems |= self._prefix_stems(term)
+        return stems
+
+    def _stem_topics(self, stems):
+        """Ascending indices of the topics containing any of stems"""
+        import numpy as np
+        arrays = [self.term_topics[term_stem][0] if term_stem in self.term_topics
+                  else self.stopword_topics.get(term_stem) for term_stem in stems]
+        arrays = [array for array in arrays if array is not None]
+        if not arrays:
+            return np.zeros(0, dtype=np.int32)
+        if len(arrays) == 1:
+            return arrays[0]
+        return np.unique(np.concatenate(arrays))
+
+    def _topic_hits(self, topic_index, stems):
+        """Spans of stems in each passage of one topic, read from its contiguous passage range"""
+        first, last = self.passage_starts[topic_index], self.passage_starts[topic_index + 1]
+        hits = {}
+        for term_stem in stems:
+            passage_ids = self.posting_ids.get(term_stem, ())
+            for position in range(bisect_left(passage_ids, first), bisect_left(passage_ids, last)):
+                passage_id = passage_ids[position]
+                hits.setdefault(passage_id, []).extend(self.postings[term_stem][passage_id])
+        return hits
+
+    def search(self, query, limit=10):
+        """Return BM25-ranked results for query; every term must appear in the topic
+
+        Matching and ranking work on per-term topic arrays; passages and
+        snippets are only looked up for the topics returned.
+        """
+        import numpy as np
+        terms = [word for word, _, _ in tokenize(query)]
+        if not terms:
+            return []
+        terms = [term for term in terms if term not in STOPWORDS] or terms
+        # Only the word being typed is treated as a prefix
+        typing = not query[-1:].isspace()
+
+        candidates = None
+        query_stems = set()
+        for position, term in enumerate(terms):
+            stems = self._term_stems(term, typing and position == len(terms) - 1)
+            query_stems |= stems
+            topics = self._stem_topics(stems)
+            candidates = topics if candidates is None else np.intersect1d(candidates, topics, assume_unique=True)
+            if not len(candidates):
+                return []
+
+        scores = self._bm25(query_stems)[candidates]
+        # Highest score first, ties broken by title
+        order = np.lexsort((self.title_ranks[candidates], -scores))[:limit]
+        results = []
+        for topic_index, score in zip(candidates[order].tolist(), scores[order].tolist()):
+            best = None
+            for passage_id, spans in self._topic_hits(topic_index, query_stems).items():
+                weight = FIELD_WEIGHTS[self.passages[passage_id][1]] * len(spans)
+                if best is None or weight > best[0]:
+                    best = (weight, passage_id, spans)
+            _, passage_id, spans = best
+            topic_key, field, text = self.passages[passage_id]
+            results.append({
+                "topic_key": topic_key,
+                "title": self.titles[topic_key],
+                "score": round(score, 3),
+                "field": field,
+                "snippet": make_snippet(text, spans)
+            })
+        return results
+
+
+def make_snippet(text, spans, width=60):
+    """Cut a window of text around the first match and bold the matched words"""
+    spans = sorted(set(spans))
+    start = max(0, spans[0][0] - width)
+    end = min(len(text), spans[0][1] + width)
+    # Widen to word boundaries so the snippet doesn't start mid-word
+    while start > 0 and text[start - 1].isalnum():
+        start -= 1
+    while end < len(text) and text[end].isalnum():
+        end += 1
+
+    pieces = ["…" if start > 0 else ""]
+    cursor = start
+    for span_start, span_end in spans:
+        if span_start < cursor or span_end > end:
+            continue
+        pieces.append(text[cursor:span_start])
+        pieces.append(f"**{text[span_start:span_end]}**")
+        cursor = span_end
+    pieces.append(text[cursor:end])
+    pieces.append("…" if end < len(text) else "")
+    return "".join(pieces)
@@ -0,0 +1,36 @@
+"""ASGI entry point that warms the app's caches as soon as the server starts
+
+    streamlit run serve.py
+    uvicorn serve:app --port 8501
+
+Serves land_law_app.py unchanged, starts the background warm-up from the
+server's lifespan instead of waiting for the first session, and adds a
+/warmup readiness endpoint: 503 while caches are still filling, then 200,
+both with a JSON summary of the warm-up tasks.
+"""
+
+import os
+from contextlib import asynccontextmanager
+
+import streamlit as st
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from warmup import start_warmup
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "land_law_app.py")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    start_warmup()
+    yield
+
+
+async def warmup_status(request):
+    """Readiness probe: the warm-up summary, 200 once every task has run and 503 before"""
+    status = start_warmup().status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
+app = st.App(APP_PATH, lifespan=lifespan, routes=[Route("/warmup", warmup_status)])
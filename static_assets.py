@@ -0,0 +1,58 @@
+"""Bundled images published through Streamlit's static file serving
+
+Source images live in assets/. Each is downscaled once to the size it is
+displayed at (doubled for high-density screens) and written to static/,
+which Streamlit serves at app/static/ when server.enableStaticServing is
+on. Published names carry a hash of the source bytes and target size, so
+a changed image gets a new URL and old URLs can be cached indefinitely.
+"""
+
+import hashlib
+import io
+import os
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSETS_DIR = os.path.join(APP_DIR, "assets")
+# Streamlit only serves a folder named "static" next to the main script
+STATIC_DIR = os.path.join(APP_DIR, "static")
+STATIC_URL = "app/static"
+
+# Published images are this many times their display width, for high-density screens
+PIXEL_RATIO = 2
+# Palette size for published PNGs; flat artwork loses nothing visible and shrinks about 5x
+PALETTE_COLORS = 64
+
+
+def asset_path(name):
+    return os.path.join(ASSETS_DIR, name)
+
+
+def publish_image(name, width, pixel_ratio=PIXEL_RATIO):
+    """Downscale assets/<name> for display at width px and return its static URL"""
+    with open(asset_path(name), "rb") as f:
+        source = f.read()
+    stem = os.path.splitext(name)[0]
+    digest = hashlib.sha256(source + f"{width}x{pixel_ratio}/{PALETTE_COLORS}".encode()).hexdigest()[:12]
+    filename = f"{stem}.{width}w.{digest}.png"
+    path = os.path.join(STATIC_DIR, filename)
+    if not os.path.exists(path):
+        from PIL import Image
+
+        with Image.open(io.BytesIO(source)) as image:
+            image.thumbnail((width * pixel_ratio, width * pixel_ratio), Image.LANCZOS)
+            image = image.quantize(PALETTE_COLORS, method=Image.Quantize.FASTOCTREE)
+            os.makedirs(STATIC_DIR, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            image.save(tmp_path, "PNG", optimize=True)
+        os.replace(tmp_path, path)
+        _remove_old_versions(f"{stem}.{width}w.", filename)
+    return f"{STATIC_URL}/{filename}"
+
+
+def _remove_old_versions(prefix, current):
+    for entry in os.scandir(STATIC_DIR):
+        if entry.name.startswith(prefix) and entry.name != current:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
@@ -0,0 +1,170 @@
+"""Static SVG/PNG rendering of the topic figures with matplotlib
+
+Plotly needs a browser (or kaleido) to produce images; matplotlib is
+already a dependency, so the traces the topic charts use - pie, bar,
+scatter/line/area and polar bar - are redrawn with it instead. Only
+matplotlib's object API is used, never pyplot, so rendering is safe from
+any thread or worker process.
+"""
+
+import io
+import math
+import re
+
+RGB_RE = re.compile(r"rgba?\(([^)]*)\)")
+
+# Plotly's default colour sequence, used when a trace sets no colour
+DEFAULT_COLORS = ("#636EFA", "#EF553B", "#00CC96", "#AB63FA", "#FFA15A",
+                  "#19D3F3", "#FF6692", "#B6E880", "#FF97FF", "#FECB52")
+
+
+def mpl_color(color):
+    """Convert a Plotly colour string to something matplotlib accepts"""
+    if not isinstance(color, str):
+        return None
+    match = RGB_RE.fullmatch(color.replace(" ", ""))
+    if match:
+        parts = [float(part) for part in match.group(1).split(",")]
+        rgb = [part / 255 for part in parts[:3]]
+        return tuple(rgb + parts[3:4])
+    return color
+
+
+def _values(values):
+    return [] if values is None else list(values)
+
+
+def _draw_pie(ax, trace, state):
+    values = _values(trace.values)
+    colors = trace.marker.colors
+    if colors is None:
+        # Plotly colours wedges from the layout's pie colorway, cycling when it runs out
+        colors = [state.pie_colors[i % len(state.pie_colors)] for i in range(len(values))]
+    hole = trace.hole or 0
+    ax.pie(
+        values,
+        labels=_values(trace.labels),
+        colors=[mpl_color(c) for c in colors],
+        wedgeprops={"width": 1 - hole} if hole else None,
+        autopct="%1.0f%%",
+        startangle=90,
+        counterclock=False
+    )
+    ax.axis("equal")
+
+
+def _draw_bar(ax, trace, state):
+    ax.bar([str(x) for x in _values(trace.x)], _values(trace.y),
+           color=mpl_color(trace.marker.color) or state.next_color(), label=trace.name)
+
+
+def _draw_scatter(ax, trace, state):
+    x, y = _values(trace.x), _values(trace.y)
+    color = mpl_color(trace.line.color) or mpl_color(trace.marker.color) or state.next_color()
+    mode = trace.mode or "lines+markers"
+    if trace.stackgroup:
+        # Stacked area (px.area): y adds onto the traces before it in the group, filled down to them
+        totals = state.stacks.setdefault(trace.stackgroup, {})
+        base = [totals.get(value, 0) for value in x]
+        y = [bottom + (value or 0) for bottom, value in zip(base, y)]
+        totals.update(zip(x, y))
+        if trace.fill != "none":
+            ax.fill_between(x, base, y, color=mpl_color(trace.fillcolor) or color,
+                            alpha=None if trace.fillcolor else 0.5, linewidth=0)
+    elif trace.fill == "tonexty" and state.previous_y is not None:
+        ax.fill_between(x, state.previous_y, y, color=mpl_color(trace.fillcolor) or color,
+                        alpha=None if trace.fillcolor else 0.2, linewidth=0)
+    elif trace.fill == "tozeroy":
+        ax.fill_between(x, y, color=mpl_color(trace.fillcolor) or color, alpha=0.4, linewidth=0)
+    width = trace.line.width
+    if "lines" in mode and width != 0:
+        ax.plot(x, y, color=color, linewidth=width or 2, label=trace.name)
+    if "markers" in mode:
+        size = trace.marker.size
+        if size is not None and not isinstance(size, (int, float)):
+            # Plotly sizes are diameters in px; scale them into a readable area range
+            size = _values(size)
+            largest = max(size) or 1
+            size = [20 + 280 * value / largest for value in size]
+        ax.scatter(x, y, s=size if size is not None else 36, color=color, zorder=3)
+    state.previous_y = y
+
+
+def _draw_barpolar(ax, trace, state):
+    step = 2 * math.pi / max(len(state.polar_categories), 1)
+    angles = [state.polar_categories.index(theta) * step for theta in _values(trace.theta)]
+    ax.bar(angles, _values(trace.r), width=step * 0.9,
+           color=mpl_color(trace.marker.color) or state.next_color(), alpha=0.85, label=trace.name)
+    ax.set_xticks([i * step for i in range(len(state.polar_categories))])
+    ax.set_xticklabels(state.polar_categories)
+
+
+DRAWERS = {
+    "pie": _draw_pie,
+    "bar": _draw_bar,
+    "scatter": _draw_scatter,
+    "barpolar": _draw_barpolar
+}
+
+
+def _pie_colorway(layout):
+    """Wedge colours of pies without their own: piecolorway, then colorway, set or from the template"""
+    template = layout.template.layout
+    for colorway in (layout.piecolorway, template.piecolorway, layout.colorway, template.colorway):
+        if colorway:
+            return list(colorway)
+    return list(DEFAULT_COLORS)
+
+
+class _DrawState:
+    """What one trace's drawing needs to know about the traces before it"""
+
+    def __init__(self, fig):
+        self.previous_y = None
+        self.pie_colors = _pie_colorway(fig.layout)
+        # stackgroup -> running total at each x of the traces drawn so far
+        self.stacks = {}
+        self.color_index = 0
+        self.polar_categories = []
+        for trace in fig.data:
+            if trace.type == "barpolar":
+                for theta in _values(trace.theta):
+                    if theta not in self.polar_categories:
+                        self.polar_categories.append(theta)
+
+    def next_color(self):
+        color = DEFAULT_COLORS[self.color_index % len(DEFAULT_COLORS)]
+        self.color_index += 1
+        return color
+
+
+def render_static(fig, fmt="svg", width=8.0, height=5.0, dpi=100):
+    """Render a Plotly figure as SVG or PNG bytes"""
+    import matplotlib
+    from matplotlib.figure import Figure
+
+    state = _DrawState(fig)
+    image = Figure(figsize=(width, height), dpi=dpi)
+    ax = image.add_subplot(projection="polar" if state.polar_categories else None)
+    for trace in fig.data:
+        drawer = DRAWERS.get(trace.type)
+        if drawer is not None:
+            drawer(ax, trace, state)
+
+    title = fig.layout.title.text
+    if title:
+        ax.set_title(title)
+    if fig.layout.xaxis.title.text:
+        ax.set_xlabel(fig.layout.xaxis.title.text)
+    if fig.layout.yaxis.title.text:
+        ax.set_ylabel(fig.layout.yaxis.title.text)
+    if not state.polar_categories and any(trace.type == "bar" for trace in fig.data):
+        ax.tick_params(axis="x", labelrotation=20)
+
+    buffer = io.BytesIO()
+    # A fixed hash salt and no date keep the bytes identical for identical figures;
+    # SVG text stays text rather than glyph paths, which makes the file several times smaller
+    metadata = {"Date": None} if fmt == "svg" else {"Software": None}
+    with matplotlib.rc_context({"svg.hashsalt": "land-law", "svg.fonttype": "none"}):
+        image.savefig(buffer, format=fmt, bbox_inches="tight", metadata=metadata)
+    return buffer.getvalue()
@@ -0,0 +1,35 @@
+"""Case queries match every word as a prefix, within the topic and year range"""
+
+from case_law import CaseIndex
+
+
+def make_index():
+    records = [{"name": f"Case {year}", "year": year, "topics": ["leases" if year % 2 else "mortgages"],
+                "holding": f"zeta{year} lease" if year % 3 else f"zeta{year} mortgage"}
+               for year in range(1900, 2000)]
+    return CaseIndex(records)
+
+
+def brute_force(index, words, topic, start, end):
+    return [case for case in index.cases
+            if (topic is None or topic in case.topics) and start <= case.year <= end
+            and all(any(word.startswith(prefix) for word in f"{case.name} {case.holding}".lower().split())
+                    for prefix in words)]
+
+
+def test_prefix_spanning_many_stems_matches_every_case():
+    # One hundred distinct zetaNNNN stems share the prefix
+    index = make_index()
+    assert index.query("zeta") == index.cases
+
+
+def test_query_intersects_topic_text_and_years():
+    index = make_index()
+    for text, topic, start, end in [("lease", "leases", 1920, 1960), ("zeta19", "mortgages", 1900, 1999),
+                                    ("mortgage zeta", None, 1950, 1950), ("lease", "mortgages", 1990, 1910)]:
+        assert index.query(text, topic, start, end) == brute_force(index, text.split(), topic, start, end)
+
+
+def test_query_limit_keeps_the_oldest_matches():
+    index = make_index()
+    assert index.query("mortgage", limit=3) == brute_force(index, ["mortgage"], None, 1900, 1999)[:3]
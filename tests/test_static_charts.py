@@ -0,0 +1,52 @@
+"""Static chart images use the same colours as the interactive Plotly charts"""
+
+import plotly.express as px
+import plotly.graph_objects as go
+import pytest
+from matplotlib.colors import to_rgba
+from matplotlib.figure import Figure
+
+from content_store import CONTENT_DIR, ContentStore
+from diagrams import build_diagram
+from static_charts import DEFAULT_COLORS, _draw_pie, _DrawState, mpl_color
+
+
+def wedge_colors(fig):
+    """Face colours of the wedges _draw_pie draws for the figure's first trace"""
+    ax = Figure().add_subplot()
+    _draw_pie(ax, fig.data[0], _DrawState(fig))
+    return [tuple(wedge.get_facecolor()) for wedge in ax.patches]
+
+
+def expected_colors(colorway, count):
+    return [to_rgba(mpl_color(colorway[i % len(colorway)])) for i in range(count)]
+
+
+@pytest.fixture(scope="module")
+def content_store():
+    return ContentStore(CONTENT_DIR)
+
+
+@pytest.mark.parametrize("topic_key", ["ownership_concepts", "mortgages"])
+def test_topic_pies_match_interactive_colors(content_store, topic_key):
+    fig = build_diagram(topic_key, content_store.get(topic_key).diagram_data)
+    layout = fig.layout
+    # What plotly.js uses: piecolorway, else colorway, else the template's colorway
+    colorway = layout.piecolorway or layout.colorway or layout.template.layout.colorway
+    assert wedge_colors(fig) == pytest.approx(expected_colors(colorway, len(fig.data[0].values)))
+
+
+def test_pie_colorway_cycles_when_wedges_outnumber_it():
+    fig = px.pie(names=list("abcde"), values=[5, 4, 3, 2, 1], color_discrete_sequence=["red", "blue"])
+    assert wedge_colors(fig) == pytest.approx(expected_colors(["red", "blue"], 5))
+
+
+def test_pie_marker_colors_win_over_colorway():
+    fig = go.Figure(go.Pie(labels=["a", "b"], values=[1, 2], marker=dict(colors=["#000000", "#ffffff"])),
+                    layout=dict(piecolorway=["red", "blue"]))
+    assert wedge_colors(fig) == pytest.approx(expected_colors(["#000000", "#ffffff"], 2))
+
+
+def test_pie_without_any_colorway_uses_plotly_defaults():
+    fig = go.Figure(go.Pie(labels=["a", "b", "c"], values=[1, 2, 3]), layout=dict(template="none"))
+    assert wedge_colors(fig) == pytest.approx(expected_colors(DEFAULT_COLORS, 3))
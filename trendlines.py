@@ -0,0 +1,119 @@
+"""Trendlines fitted with NumPy least squares, added to figures as plain traces
+
+A topic's diagram_data can ask for a trendline declaratively, e.g.
+
+    "trendline": {"x": "years", "y": "success_rate", "kind": "linear", "bands": true}
+
+Supported kinds are "linear", "poly" (with "degree") and "rolling" (with "window").
+"""
+
+import numpy as np
+
+# Points at which fitted curves are evaluated, however long the input series is
+CURVE_POINTS = 200
+
+# Two-sided normal quantiles for the confidence levels we support
+Z_SCORES = {0.8: 1.2816, 0.9: 1.6449, 0.95: 1.9600, 0.99: 2.5758}
+
+
+def t_quantile(confidence, dof):
+    """Approximate two-sided Student t quantile (Cornish-Fisher expansion)"""
+    z = Z_SCORES[confidence]
+    if dof <= 0:
+        return float("inf")
+    return (z
+            + (z ** 3 + z) / (4 * dof)
+            + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * dof ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * dof ** 3))
+
+
+def poly_fit(x, y, degree=1, confidence=0.95, points=CURVE_POINTS):
+    """Least-squares polynomial fit evaluated on an even grid over x
+
+    Returns a dict with the grid, fitted values, lower/upper confidence band of
+    the mean, coefficients (highest power first) and R².
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    design = np.vander(x, degree + 1)
+    coef, _, _, _ = np.linalg.lstsq(design, y, rcond=None)
+
+    residuals = y - design @ coef
+    ss_res = float(residuals @ residuals)
+    centred = y - y.mean()
+    ss_tot = float(centred @ centred)
+    r_squared = 1 - ss_res / ss_tot if ss_tot else 1.0
+
+    grid = np.linspace(x.min(), x.max(), min(points, max(len(x), 2)))
+    grid_design = np.vander(grid, degree + 1)
+    fitted = grid_design @ coef
+
+    # Standard error of the fitted mean: s² · diag(X0 (XᵀX)⁻¹ X0ᵀ)
+    dof = len(x) - (degree + 1)
+    if dof > 0:
+        variance = ss_res / dof
+        xtx_inv = np.linalg.pinv(design.T @ design)
+        leverage = np.einsum("ij,jk,ik->i", grid_design, xtx_inv, grid_design)
+        half_width = t_quantile(confidence, dof) * np.sqrt(variance * leverage)
+    else:
+        half_width = np.zeros_like(fitted)
+
+    return {
+        "x": grid,
+        "y": fitted,
+        "lower": fitted - half_width,
+        "upper": fitted + half_width,
+        "coef": coef,
+        "r_squared": r_squared
+    }
+
+
+def rolling_mean(x, y, window=3):
+    """Trailing rolling mean of y (sorted by x) computed from a cumulative sum"""
+    order = np.argsort(x, kind="stable")
+    x = np.asarray(x, dtype=float)[order]
+    y = np.asarray(y, dtype=float)[order]
+    window = max(1, min(int(window), len(y)))
+    sums = np.cumsum(np.concatenate(([0.0], y)))
+    means = (sums[window:] - sums[:-window]) / window
+    return {"x": x[window - 1:], "y": means}
+
+
+def compute_trendline(data, spec):
+    """Fit the trendline described by spec against the series in diagram data"""
+    x = data[spec["x"]]
+    y = data[spec["y"]]
+    kind = spec.get("kind", "linear")
+    if kind == "linear":
+        return poly_fit(x, y, 1, spec.get("confidence", 0.95))
+    if kind == "poly":
+        return poly_fit(x, y, spec.get("degree", 2), spec.get("confidence", 0.95))
+    if kind == "rolling":
+        return rolling_mean(x, y, spec.get("window", 3))
+    raise ValueError(f"Unknown trendline kind: {kind}")
+
+
+def trendline_traces(data, spec, color="#E76F51"):
+    """Plotly traces (fit line plus optional confidence band) for a trendline spec"""
+    import plotly.graph_objects as go
+
+    fit = compute_trendline(data, spec)
+    kind = spec.get("kind", "linear")
+    if kind == "rolling":
+        name = f"Rolling mean ({spec.get('window', 3)})"
+    elif kind == "poly":
+        name = f"Polynomial fit, degree {spec.get('degree', 2)} (R²={fit['r_squared']:.3f})"
+    else:
+        name = f"Linear fit (R²={fit['r_squared']:.3f})"
+
+    traces = []
+    if spec.get("bands") and "lower" in fit:
+        band = f"{int(spec.get('confidence', 0.95) * 100)}% confidence"
+        traces.append(go.Scatter(x=fit["x"], y=fit["upper"], mode="lines", line=dict(width=0),
+                                 hoverinfo="skip", showlegend=False, name=band))
+        traces.append(go.Scatter(x=fit["x"], y=fit["lower"], mode="lines", line=dict(width=0),
+                                 fill="tonexty", fillcolor="rgba(231, 111, 81, 0.2)",
+                                 hoverinfo="skip", name=band))
+    traces.append(go.Scatter(x=fit["x"], y=fit["y"], mode="lines", line=dict(color=color, width=2),
+                             name=name))
+    return traces
@@ -0,0 +1,107 @@
+"""Background cache warm-up, run once per server process
+
+start_warmup() fills the shared caches in app_cache on a daemon thread, so
+the first visitor after a deploy gets pages as fast as later ones without
+their first render waiting on it. A visitor who asks for something the
+warm-up is still building waits only for that entry (st.cache_resource
+computes each key once). It is started from the server's lifespan when the
+app is served through serve.py, and from the app script otherwise, where
+the first session to connect starts it.
+
+Readiness is logged when the warm-up finishes and served as JSON from
+/warmup by serve.py. Set LAND_LAW_WARMUP=0 to turn it off.
+"""
+
+import atexit
+import os
+import threading
+import time
+
+import streamlit as st
+from streamlit.logger import get_logger
+
+from app_cache import warm_up_tasks
+
+ENABLED = os.environ.get("LAND_LAW_WARMUP", "1") not in ("", "0", "false")
+
+# Seconds an exiting process waits for the running task (e.g. an export pool) to finish
+SHUTDOWN_TIMEOUT = 10.0
+
+# Streamlit's logger, so the readiness line appears in the server log
+logger = get_logger(__name__)
+
+
+class WarmUp:
+    """Runs named warm-up tasks in order on a background thread and reports progress"""
+
+    def __init__(self, tasks):
+        self.tasks = list(tasks)
+        self.timings = {}
+        self.errors = {}
+        self.started = None
+        self.finished = None
+        self.done = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.started = time.monotonic()
+        if not self.tasks:
+            self.finished = self.started
+            self.done.set()
+            return self
+        self._thread = threading.Thread(target=self._run, name="land-law-warmup", daemon=True)
+        self._thread.start()
+        # Exiting mid-task would tear down the thread inside native code or a worker pool
+        atexit.register(self.stop)
+        return self
+
+    def stop(self, timeout=SHUTDOWN_TIMEOUT):
+        """Skip the remaining tasks and wait for the running one to finish"""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        for name, task in self.tasks:
+            if self._stopping.is_set():
+                return
+            start = time.perf_counter()
+            try:
+                task()
+            except Exception as exc:
+                # A failed task only leaves its cache cold; pages still build it on demand
+                logger.exception("Warm-up task %r failed", name)
+                self.errors[name] = f"{type(exc).__name__}: {exc}"
+            self.timings[name] = time.perf_counter() - start
+        self.finished = time.monotonic()
+        self.done.set()
+        logger.info("Warm-up finished in %.1f s (%s)%s", self.finished - self.started,
+                    ", ".join(f"{name} {seconds:.2f} s" for name, seconds in self.timings.items()),
+                    f"; failed: {', '.join(self.errors)}" if self.errors else "")
+
+    def wait(self, timeout=None):
+        """Block until every task has run; True unless the timeout expired first"""
+        return self.done.wait(timeout)
+
+    @property
+    def ready(self):
+        return self.done.is_set()
+
+    def status(self):
+        """Readiness summary for the health endpoint"""
+        end = self.finished if self.finished is not None else time.monotonic()
+        return {
+            "ready": self.ready,
+            "seconds": round(end - self.started, 3) if self.started is not None else 0.0,
+            "completed": list(self.timings),
+            "pending": [name for name, _ in self.tasks if name not in self.timings],
+            "errors": dict(self.errors)
+        }
+
+
+@st.cache_resource(show_spinner=False)
+def start_warmup():
+    """Start the process's warm-up once; later calls return the same WarmUp"""
+    warm_up = WarmUp(warm_up_tasks() if ENABLED else [])
+    return warm_up.start()